@@ -10,8 +10,10 @@
 
 import cv2
 import numpy as np
-from typing import Tuple, Optional, Union, Dict, Any
+from typing import Tuple, Optional, Union, Dict, Any, List
+import inspect
 import logging
+import threading
 from .utils import ImageUtils
 
 logger = logging.getLogger(__name__)
@@ -22,6 +24,87 @@ class Binarizer:
     
     def __init__(self):
         self.image_utils = ImageUtils()
+        
+        # 按线程缓存的中间缓冲区：连续处理同尺寸页面时复用，避免每次调用重复分配整幅浮点数组
+        self._workspace = threading.local()
+        
+        # 组合阈值化可用的单一方法（OpenCV 阈值化内核会释放GIL，可在共享线程池中并行执行）
+        self._combinable_methods = {
+            'adaptive_gaussian': self.adaptive_threshold_gaussian,
+            'adaptive_mean': self.adaptive_threshold_mean,
+            'otsu': self.otsu_threshold,
+            'triangle': self.triangle_threshold,
+        }
+        
+        # 按尺寸缓存的形态学结构元素，避免每次后处理重复创建
+        self._rect_kernels: Dict[int, np.ndarray] = {}
+        
+        # 二值化方法分派表，以及各处理步骤可接受的参数名（binarize 按此拆分 kwargs，
+        # 避免某一步的参数传入另一步导致 TypeError）
+        self._methods = {
+            "adaptive_gaussian": self.adaptive_threshold_gaussian,
+            "adaptive_mean": self.adaptive_threshold_mean,
+            "otsu": self.otsu_threshold,
+            "triangle": self.triangle_threshold,
+            "sauvola": self.sauvola_threshold,
+            "combined": self.combined_threshold,
+        }
+        self._method_params = {
+            name: self._accepted_params(func) for name, func in self._methods.items()
+        }
+        self._preprocess_params = self._accepted_params(self.preprocess_for_binarization)
+        self._postprocess_params = self._accepted_params(self.postprocess_binary)
+    
+    @staticmethod
+    def _accepted_params(func) -> frozenset:
+        """
+        获取处理函数除输入图像外可接受的关键字参数名
+        
+        Args:
+            func: 绑定方法，第一个参数为输入图像
+            
+        Returns:
+            frozenset: 参数名集合
+        """
+        return frozenset(list(inspect.signature(func).parameters)[1:])
+    
+    @staticmethod
+    def _select_kwargs(kwargs: Dict[str, Any], accepted: frozenset) -> Dict[str, Any]:
+        """
+        从 kwargs 中挑选出目标函数接受的参数
+        
+        Args:
+            kwargs: 调用方传入的全部参数
+            accepted: 目标函数可接受的参数名
+            
+        Returns:
+            Dict[str, Any]: 过滤后的参数
+        """
+        return {key: value for key, value in kwargs.items() if key in accepted}
+    
+    def _get_buffer(self, name: str, shape: Tuple[int, ...], dtype=np.float32) -> np.ndarray:
+        """
+        获取当前线程的可复用中间缓冲区
+        
+        每个名称只保留最近一次的尺寸，尺寸或类型变化时重新分配；
+        返回的数组内容未初始化，只能用作中间结果，不能作为返回值交给调用方
+        
+        Args:
+            name: 缓冲区名称
+            shape: 数组形状
+            dtype: 数据类型
+            
+        Returns:
+            np.ndarray: 缓冲区数组
+        """
+        buffers = getattr(self._workspace, "buffers", None)
+        if buffers is None:
+            buffers = self._workspace.buffers = {}
+        
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = buffers[name] = np.empty(shape, dtype=dtype)
+        return buffer
     
     def binarize(self, image: np.ndarray, 
                 method: str = "adaptive_gaussian",
@@ -31,8 +114,8 @@ class Binarizer:
         
         Args:
             image: 输入图像
-            method: 二值化方法 ("adaptive_gaussian", "adaptive_mean", "otsu", "triangle", "sauvola")
-            **kwargs: 方法特定参数
+            method: 二值化方法 ("adaptive_gaussian", "adaptive_mean", "otsu", "triangle", "sauvola", "combined")
+            **kwargs: 预处理、二值化方法和后处理的参数，按各步骤的参数名分发
             
         Returns:
             np.ndarray: 二值化后的图像
@@ -40,28 +123,21 @@ class Binarizer:
         try:
             logger.info(f"开始二值化处理，方法: {method}")
             
+            threshold_func = self._methods.get(method)
+            if threshold_func is None:
+                logger.warning(f"未知的二值化方法: {method}，使用默认方法")
+                method = "adaptive_gaussian"
+                threshold_func = self._methods[method]
+            
             # 预处理
-            preprocessed = self.preprocess_for_binarization(image, **kwargs)
+            preprocessed = self.preprocess_for_binarization(
+                image, **self._select_kwargs(kwargs, self._preprocess_params))
             
             # 应用指定的二值化方法
-            if method == "adaptive_gaussian":
-                result = self.adaptive_threshold_gaussian(preprocessed, **kwargs)
-            elif method == "adaptive_mean":
-                result = self.adaptive_threshold_mean(preprocessed, **kwargs)
-            elif method == "otsu":
-                result = self.otsu_threshold(preprocessed, **kwargs)
-            elif method == "triangle":
-                result = self.triangle_threshold(preprocessed, **kwargs)
-            elif method == "sauvola":
-                result = self.sauvola_threshold(preprocessed, **kwargs)
-            elif method == "combined":
-                result = self.combined_threshold(preprocessed, **kwargs)
-            else:
-                logger.warning(f"未知的二值化方法: {method}，使用默认方法")
-                result = self.adaptive_threshold_gaussian(preprocessed, **kwargs)
+            result = threshold_func(preprocessed, **self._select_kwargs(kwargs, self._method_params[method]))
             
             # 后处理
-            result = self.postprocess_binary(result, **kwargs)
+            result = self.postprocess_binary(result, **self._select_kwargs(kwargs, self._postprocess_params))
             
             logger.info("二值化处理完成")
             return result
@@ -70,6 +146,28 @@ class Binarizer:
             logger.error(f"二值化处理失败: {str(e)}")
             return image
     
+    def binarize_batch(self, images: List[np.ndarray],
+                      method: str = "adaptive_gaussian",
+                      max_workers: Optional[int] = None,
+                      **kwargs) -> List[np.ndarray]:
+        """
+        批量二值化多页图像
+        
+        各页在线程池中并行处理，批量期间 OpenCV 以单线程运行（见 ImageUtils.map_batch），
+        中间缓冲区按线程隔离
+        
+        Args:
+            images: 输入图像列表
+            method: 二值化方法，同 binarize
+            max_workers: 最大线程数，默认使用CPU核数
+            **kwargs: 方法特定参数
+            
+        Returns:
+            List[np.ndarray]: 与输入顺序一致的二值化结果
+        """
+        return self.image_utils.map_batch(
+            lambda image: self.binarize(image, method, **kwargs), images, max_workers)
+    
     def preprocess_for_binarization(self, image: np.ndarray,
                                    denoise: bool = True,
                                    enhance_contrast: bool = True,
@@ -250,20 +348,29 @@ class Binarizer:
             if window_size % 2 == 0:
                 window_size += 1
             
-            # 计算局部均值和标准差
-            mean = cv2.boxFilter(gray.astype(np.float32), -1, (window_size, window_size))
-            sqr_mean = cv2.boxFilter((gray.astype(np.float32))**2, -1, (window_size, window_size))
-            
-            # 计算标准差
-            variance = sqr_mean - mean**2
-            variance = np.maximum(variance, 0)  # 确保非负
-            std_dev = np.sqrt(variance)
-            
-            # 计算Sauvola阈值
-            threshold = mean * (1 + k * ((std_dev / r) - 1))
-            
-            # 应用阈值
-            result = np.where(gray >= threshold, 255, 0).astype(np.uint8)
+            # 计算局部均值和平方均值（sqrBoxFilter 直接对平方求盒式均值，无需先构造平方图像）
+            shape = gray.shape
+            gray_float = self._get_buffer("gray_float", shape)
+            np.copyto(gray_float, gray)
+            ksize = (window_size, window_size)
+            mean = cv2.boxFilter(gray_float, cv2.CV_32F, ksize, dst=self._get_buffer("mean", shape))
+            variance = cv2.sqrBoxFilter(gray_float, cv2.CV_32F, ksize,
+                                        dst=self._get_buffer("variance", shape))
+            
+            # 计算标准差与阈值，全部在 variance 缓冲区上原地完成，不再分配额外的整幅临时数组
+            # （mean² 暂存在输入的浮点副本中，比较前再恢复）
+            cv2.multiply(mean, mean, dst=gray_float)
+            cv2.subtract(variance, gray_float, dst=variance)
+            np.maximum(variance, 0, out=variance)  # 确保非负
+            std_dev = cv2.sqrt(variance, dst=variance)
+            
+            # 计算Sauvola阈值: mean * (1 + k * (std/r - 1)) = mean * (1 - k) + (k/r) * mean * std
+            threshold = cv2.multiply(mean, std_dev, dst=std_dev, scale=k / r)
+            cv2.scaleAdd(mean, 1 - k, threshold, dst=threshold)
+            np.copyto(gray_float, gray)
+            
+            # 应用阈值，直接输出 0/255 的 uint8
+            result = cv2.compare(gray_float, threshold, cv2.CMP_GE)
             
             logger.debug(f"Sauvola阈值化完成，window_size={window_size}, k={k}")
             return result
@@ -294,36 +401,37 @@ class Binarizer:
             
             logger.info("开始组合阈值化")
             
-            results = {}
-            
-            # 应用各种方法
-            if 'adaptive_gaussian' in weights:
-                results['adaptive_gaussian'] = self.adaptive_threshold_gaussian(gray)
-            
-            if 'adaptive_mean' in weights:
-                results['adaptive_mean'] = self.adaptive_threshold_mean(gray)
-            
-            if 'otsu' in weights:
-                results['otsu'] = self.otsu_threshold(gray)
-            
-            if 'triangle' in weights:
-                results['triangle'] = self.triangle_threshold(gray)
-            
-            # 加权组合
-            combined = np.zeros_like(gray, dtype=np.float32)
-            total_weight = 0
-            
-            for method, weight in weights.items():
-                if method in results:
-                    combined += results[method].astype(np.float32) * weight
-                    total_weight += weight
-            
-            # 标准化
+            # 并行应用各种方法（各方法相互独立，只读共享输入图像）
+            futures = {
+                method: self.image_utils.submit_task(threshold_func, gray)
+                for method, threshold_func in self._combinable_methods.items()
+                if method in weights
+            }
+            results = {method: future.result() for method, future in futures.items()}
+            
+            # 加权组合：各结果都只取 0/255，逐像素记录哪些方法判为前景（第 i 位对应第 i 个方法），
+            # 再用查找表把每种组合的加权投票直接映射为 0/255，全程保持 uint8，不需要浮点累加器
+            selected = [(method, weight) for method, weight in weights.items() if method in results]
+            total_weight = sum(weight for _, weight in selected)
+            
+            votes = self._get_buffer("votes", gray.shape, np.uint8)
+            votes.fill(0)
+            vote_bit = self._get_buffer("vote_bit", gray.shape, np.uint8)
+            for bit, (method, _) in enumerate(selected):
+                cv2.bitwise_and(results[method], 1 << bit, dst=vote_bit)
+                cv2.bitwise_or(votes, vote_bit, dst=votes)
+            
+            # 组合编码 -> 加权均值是否达到 127.5（与标准化后的浮点加权和的判断一致）
+            lut = np.zeros(256, dtype=np.uint8)
             if total_weight > 0:
-                combined /= total_weight
+                for code in range(1 << len(selected)):
+                    score = sum(255.0 * weight for bit, (_, weight) in enumerate(selected)
+                                if code & (1 << bit))
+                    if score / total_weight >= 127.5:
+                        lut[code] = 255
             
             # 转换为二值图像
-            result = np.where(combined >= 127.5, 255, 0).astype(np.uint8)
+            result = cv2.LUT(votes, lut)
             
             logger.info("组合阈值化完成")
             return result
@@ -352,10 +460,12 @@ class Binarizer:
             result = binary.copy()
             
             if remove_noise or fill_holes:
-                kernel = cv2.getStructuringElement(
-                    cv2.MORPH_RECT, 
-                    (morphology_kernel_size, morphology_kernel_size)
-                )
+                kernel = self._rect_kernels.get(morphology_kernel_size)
+                if kernel is None:
+                    kernel = self._rect_kernels[morphology_kernel_size] = cv2.getStructuringElement(
+                        cv2.MORPH_RECT, 
+                        (morphology_kernel_size, morphology_kernel_size)
+                    )
                 
                 if remove_noise:
                     # 开运算去除小的噪声点
@@ -425,24 +535,26 @@ class Binarizer:
         
         try:
             # 计算光照变化
+            # meanStdDev 一次 SIMD 扫描得到方差，避免 np.var 的多次遍历和 float64 临时数组
             blur = cv2.GaussianBlur(gray, (21, 21), 0)
-            illumination_variance = np.var(blur)
-            features['illumination_variance'] = float(illumination_variance)
+            _, blur_std = cv2.meanStdDev(blur)
+            features['illumination_variance'] = float(blur_std[0, 0]) ** 2
             
             # 计算对比度
-            hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
-            hist = hist.flatten() / hist.sum()
-            contrast = np.sum(hist * np.arange(256)**2) - (np.sum(hist * np.arange(256)))**2
-            features['contrast'] = float(contrast) / 65536  # 标准化
+            # 即灰度方差 E[X²] - E[X]²，meanStdDev 一次扫描即可得到，无需先统计直方图
+            _, gray_std = cv2.meanStdDev(gray)
+            features['contrast'] = float(gray_std[0, 0]) ** 2 / 65536  # 标准化
             
             # 估计噪声水平
-            laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-            noise_level = np.var(laplacian) / 10000  # 标准化
+            # 8 位输入的 3x3 拉普拉斯响应在 int16 范围内，无需 CV_64F；方差由 meanStdDev 一次求出
+            laplacian = cv2.Laplacian(gray, cv2.CV_16S)
+            _, laplacian_std = cv2.meanStdDev(laplacian)
+            noise_level = float(laplacian_std[0, 0]) ** 2 / 10000  # 标准化
             features['noise_level'] = float(noise_level)
             
             # 计算边缘密度
             edges = cv2.Canny(gray, 50, 150)
-            edge_density = np.sum(edges > 0) / edges.size
+            edge_density = cv2.countNonZero(edges) / edges.size
             features['edge_density'] = float(edge_density)
             
         except Exception as e:
@@ -457,6 +569,22 @@ class Binarizer:
         
         return features
     
+    @staticmethod
+    def _gradient_edges(image: np.ndarray, threshold: int = 100) -> np.ndarray:
+        """
+        基于 Sobel 梯度幅值的边缘掩码
+        
+        Args:
+            image: 8 位灰度图像
+            threshold: 梯度幅值阈值（|gx| + |gy|）
+            
+        Returns:
+            np.ndarray: 0/255 的 uint8 边缘掩码
+        """
+        grad_x, grad_y = cv2.spatialGradient(image)
+        magnitude = cv2.add(cv2.convertScaleAbs(grad_x), cv2.convertScaleAbs(grad_y))
+        return cv2.compare(magnitude, threshold, cv2.CMP_GT)
+    
     def evaluate_binarization_quality(self, original: np.ndarray, 
                                     binary: np.ndarray) -> Dict[str, float]:
         """
@@ -478,20 +606,22 @@ class Binarizer:
             else:
                 gray = original.copy()
             
-            # 1. 边缘保持度
-            original_edges = cv2.Canny(gray, 50, 150)
-            binary_edges = cv2.Canny(binary, 50, 150)
+            # 1. 边缘保持度（只需统计重叠的边缘像素，用梯度幅值阈值代替 Canny 的非极大值抑制与滞后阈值）
+            original_edges = self._gradient_edges(gray)
+            binary_edges = self._gradient_edges(binary)
             
-            edge_preservation = np.sum(original_edges & binary_edges) / max(np.sum(original_edges), 1)
+            preserved_edges = cv2.countNonZero(cv2.bitwise_and(original_edges, binary_edges))
+            edge_preservation = preserved_edges / max(cv2.countNonZero(original_edges), 1)
             metrics['edge_preservation'] = float(edge_preservation)
             
             # 2. 前景-背景分离度
-            foreground_pixels = binary == 0  # 假设文本是黑色
-            background_pixels = binary == 255
+            # uint8 掩码可直接用于 cv2.mean 的掩码均值，避免布尔索引收集像素
+            foreground_mask = cv2.compare(binary, 0, cv2.CMP_EQ)  # 假设文本是黑色
+            background_mask = cv2.compare(binary, 255, cv2.CMP_EQ)
             
-            if np.sum(foreground_pixels) > 0 and np.sum(background_pixels) > 0:
-                fg_mean = np.mean(gray[foreground_pixels])
-                bg_mean = np.mean(gray[background_pixels])
+            if cv2.countNonZero(foreground_mask) > 0 and cv2.countNonZero(background_mask) > 0:
+                fg_mean = cv2.mean(gray, mask=foreground_mask)[0]
+                bg_mean = cv2.mean(gray, mask=background_mask)[0]
                 separation = abs(bg_mean - fg_mean) / 255.0
                 metrics['fg_bg_separation'] = float(separation)
             else:
@@ -499,11 +629,15 @@ class Binarizer:
             
             # 3. 噪声水平
             # 计算小连通组件的比例（可能是噪声）
-            num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(
-                255 - binary, connectivity=8
+            # 只用到 stats；前景像素数是组件数的上界，不超过 65535 时标签图用 16 位即可。
+            # 标签溢出时 OpenCV 不会抛出异常而是直接破坏内存，因此必须在调用前判断
+            inverted = cv2.bitwise_not(binary)
+            label_type = cv2.CV_16U if cv2.countNonZero(inverted) <= 65535 else cv2.CV_32S
+            num_labels, _, stats, _ = cv2.connectedComponentsWithStats(
+                inverted, connectivity=8, ltype=label_type
             )
             
-            small_components = np.sum(stats[1:, cv2.CC_STAT_AREA] < 50)  # 面积小于50的组件
+            small_components = np.count_nonzero(stats[1:, cv2.CC_STAT_AREA] < 50)  # 面积小于50的组件
             total_components = num_labels - 1  # 排除背景
             
             if total_components > 0:
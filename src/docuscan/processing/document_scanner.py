@@ -7,8 +7,17 @@
 
 import cv2
 import numpy as np
-from typing import Dict, Any, Optional, Tuple, List
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import cached_property
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Tuple, List, Mapping
+import hashlib
 import logging
+import os
+import threading
+import time
 from PIL import Image
 
 from .geometric_correction import GeometricCorrector
@@ -19,169 +28,335 @@ from .utils import ImageUtils
 
 logger = logging.getLogger(__name__)
 
+# 质量检测中低频统计量（光照、倾斜、对比度）所用图像的最大边长
+QUALITY_ANALYSIS_SIZE = 1024
+
+# 倾斜角度缓存的最大条目数
+SKEW_CACHE_SIZE = 32
+
+# 整体质量评分中各项指标的权重
+QUALITY_WEIGHTS = {
+    "sharpness": 0.3,
+    "illumination": 0.3,
+    "skew": 0.2,
+    "contrast": 0.2,
+}
+
+
+def _freeze_config(config: Dict[str, Dict[str, Any]]) -> Mapping[str, Mapping[str, Any]]:
+    """
+    将两层结构的配置字典（节 -> 参数）包装为只读映射
+
+    Args:
+        config: 配置字典
+
+    Returns:
+        Mapping[str, Mapping[str, Any]]: 只读配置
+    """
+    return MappingProxyType(
+        {section: MappingProxyType(settings) for section, settings in config.items()}
+    )
+
+
+# 默认处理配置
+DEFAULT_CONFIG = _freeze_config({
+    # 几何校正配置
+    "geometric": {
+        "enable_perspective": False,  # 关闭透视校正
+        "enable_deskew": True,  # 保留去偏斜
+        "enable_crop": True,  # 保留自动裁剪
+    },
+    # 背景处理配置
+    "background": {
+        "method": "median_division",
+        "kernel_size": 40,
+        "brightness_adjustment": 0.3,
+        "contrast_adjustment": 1.2,
+    },
+    # 二值化配置
+    "binarization": {
+        "enable": False,  # 默认不进行二值化，保持彩色输出
+        "method": "adaptive_gaussian",
+        "block_size": 11,
+        "c_constant": 2,
+    },
+    # 图像增强配置
+    "enhancement": {
+        "enhance_contrast": True,
+        "reduce_noise": True,
+        "sharpen": True,
+        "gamma_correction": False,
+    },
+    # 输出配置
+    "output": {
+        "white_background": False,  # 默认关闭白底处理，避免过度增白
+        "max_width": 2000,
+        "max_height": 2000,
+        "quality": 95,
+    },
+})
+
+# 平衡模式配置 - 更温和的处理选项
+BALANCED_CONFIG = _freeze_config({
+    # 几何校正配置
+    "geometric": {
+        "enable_perspective": False,
+        "enable_deskew": True,
+        "enable_crop": True,
+    },
+    # 背景处理配置 - 更保守的参数
+    "background": {
+        "method": "median_division",
+        "kernel_size": 25,  # 较小的核，减少过度处理
+        "brightness_adjustment": 1.20,  # 更强的亮度提升，改善背景白度
+        "contrast_adjustment": 1.08,  # 适度增加对比度
+    },
+    # 二值化配置
+    "binarization": {
+        "enable": False,
+        "method": "adaptive_gaussian",
+        "block_size": 15,  # 更大的块，更平滑的效果
+        "c_constant": 5,  # 更大的常数，保留更多细节
+    },
+    # 图像增强配置 - 减少处理强度
+    "enhancement": {
+        "enhance_contrast": True,
+        "reduce_noise": False,  # 关闭降噪，保持原始细节
+        "sharpen": False,  # 关闭锐化，避免过度处理
+        "gamma_correction": False,
+    },
+    # 输出配置
+    "output": {
+        "white_background": False,
+        "max_width": 2000,
+        "max_height": 2000,
+        "quality": 95,
+    },
+})
+
+# 自然模式配置 - 最大程度保留原图特征，只做必要优化
+NATURAL_CONFIG = _freeze_config({
+    # 几何校正配置
+    "geometric": {
+        "enable_perspective": False,
+        "enable_deskew": True,
+        "enable_crop": True,
+    },
+    # 背景处理配置 - 最轻微的处理
+    "background": {
+        "method": "natural_enhancement",
+        "brightness_boost": 1.15,  # 提升亮度，改善背景白度
+        "contrast_boost": 1.05,  # 轻微增加对比度
+        "preserve_ratio": 0.5,  # 保留50%原图特征，允许更多白化
+    },
+    # 二值化配置
+    "binarization": {
+        "enable": False,
+        "method": "adaptive_gaussian",
+        "block_size": 21,
+        "c_constant": 8,
+    },
+    # 图像增强配置 - 最小化处理
+    "enhancement": {
+        "enhance_contrast": False,  # 关闭对比度增强
+        "reduce_noise": False,  # 关闭降噪
+        "sharpen": False,  # 关闭锐化
+        "gamma_correction": False,
+    },
+    # 输出配置
+    "output": {
+        "white_background": False,
+        "auto_crop": False,  # 保留原图，不裁剪边框
+        "max_width": 2000,
+        "max_height": 2000,
+        "quality": 95,
+    },
+})
+
+# 超白模式配置 - 专门解决背景不够白净的问题
+ULTRA_WHITE_CONFIG = _freeze_config({
+    # 几何校正配置
+    "geometric": {
+        "enable_perspective": False,
+        "enable_deskew": True,
+        "enable_crop": True,
+    },
+    # 背景处理配置 - 超强白化
+    "background": {
+        "method": "ultra_whitening",
+        "kernel_size": 25,
+        "whitening_strength": 1.3,  # 强力白化
+        "background_threshold": 0.7,  # 背景检测阈值
+    },
+    # 二值化配置
+    "binarization": {
+        "enable": False,
+        "method": "adaptive_gaussian",
+        "block_size": 15,
+        "c_constant": 3,
+    },
+    # 图像增强配置 - 适度增强
+    "enhancement": {
+        "enhance_contrast": True,  # 开启对比度增强
+        "reduce_noise": False,  # 关闭降噪，保持清晰度
+        "sharpen": False,  # 关闭锐化，避免过度处理
+        "gamma_correction": False,
+    },
+    # 输出配置
+    "output": {
+        "white_background": False,  # 已经通过背景处理实现白化
+        "auto_crop": True,  # 背景已白化，裁剪白色边框
+        "max_width": 2000,
+        "max_height": 2000,
+        "quality": 95,
+    },
+})
+
+# 批量处理工作进程内的扫描器实例（每个进程首次使用时创建）
+_worker_scanner = None
+
+# 批量处理的进程池：跨 batch_process 调用复用，避免每批都重新启动工作进程；
+# 工作进程数变化或进程池损坏时重建
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+
+def _worker_init() -> None:
+    """
+    批量处理工作进程的初始化函数
+
+    多个进程并行时，每个进程再启用 OpenCV/OpenMP 的内部线程池会造成
+    进程数 × 线程数 的过度订阅，因此工作进程内只使用单线程
+    """
+    os.environ["OMP_NUM_THREADS"] = "1"
+    cv2.setNumThreads(1)
+
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    获取批量处理共用的进程池
+
+    Args:
+        workers: 工作进程数
+
+    Returns:
+        ProcessPoolExecutor: 进程池（工作进程按需启动）
+    """
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_workers != workers:
+            if _process_pool is not None:
+                # 已提交的任务仍会执行完毕
+                _process_pool.shutdown(wait=False)
+            _process_pool = ProcessPoolExecutor(max_workers=workers, initializer=_worker_init)
+            _process_pool_workers = workers
+        return _process_pool
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    丢弃已损坏的进程池（例如工作进程被系统终止），下次批量处理时重建
+
+    Args:
+        pool: 损坏的进程池
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False)
+
+
+def _scan_one(image: np.ndarray, config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    在批量处理的工作进程中扫描单个图像
+
+    定义为模块级函数以便进程池序列化调用
+
+    Args:
+        image: 输入图像
+        config: 调用方扫描器合并后的完整处理配置
+
+    Returns:
+        Dict[str, Any]: scan_document 的处理结果
+    """
+    global _worker_scanner
+    if _worker_scanner is None:
+        _worker_scanner = DocumentScanner()
+    return _worker_scanner.scan_document(image, config)
+
 
 class DocumentScanner:
     """文档扫描器主类"""
 
-    def __init__(self):
-        """初始化各个处理模块"""
-        self.geometric_corrector = GeometricCorrector()
-        self.background_processor = BackgroundProcessor()
-        self.binarizer = Binarizer()
-        self.image_enhancer = ImageEnhancer()
+    def __init__(self, warmup: bool = False):
+        """
+        初始化扫描器配置
+
+        各处理模块在首次使用时才创建（见下方的 cached_property），
+        不使用的模块（例如未开启二值化时的 Binarizer）不会产生初始化开销
+
+        Args:
+            warmup: 是否在初始化时预热处理流程，避免首次请求承担延迟初始化开销
+        """
         self.image_utils = ImageUtils()
 
-        # 默认处理配置
-        self.default_config = {
-            # 几何校正配置
-            "geometric": {
-                "enable_perspective": False,  # 关闭透视校正
-                "enable_deskew": True,  # 保留去偏斜
-                "enable_crop": True,  # 保留自动裁剪
-            },
-            # 背景处理配置
-            "background": {
-                "method": "median_division",
-                "kernel_size": 40,
-                "brightness_adjustment": 0.3,
-                "contrast_adjustment": 1.2,
-            },
-            # 二值化配置
-            "binarization": {
-                "enable": False,  # 默认不进行二值化，保持彩色输出
-                "method": "adaptive_gaussian",
-                "block_size": 11,
-                "c_constant": 2,
-            },
-            # 图像增强配置
-            "enhancement": {
-                "enhance_contrast": True,
-                "reduce_noise": True,
-                "sharpen": True,
-                "gamma_correction": False,
-            },
-            # 输出配置
-            "output": {
-                "white_background": False,  # 默认关闭白底处理，避免过度增白
-                "max_width": 2000,
-                "max_height": 2000,
-                "quality": 95,
-            },
-        }
+        # 每个线程独立的可复用缓冲区（API 服务在线程池中共享同一个扫描器）
+        self._workspace = threading.local()
 
-        # 平衡模式配置 - 更温和的处理选项
-        self.balanced_config = {
-            # 几何校正配置
-            "geometric": {
-                "enable_perspective": False,
-                "enable_deskew": True,
-                "enable_crop": True,
-            },
-            # 背景处理配置 - 更保守的参数
-            "background": {
-                "method": "median_division",
-                "kernel_size": 25,  # 较小的核，减少过度处理
-                "brightness_adjustment": 1.20,  # 更强的亮度提升，改善背景白度
-                "contrast_adjustment": 1.08,  # 适度增加对比度
-            },
-            # 二值化配置
-            "binarization": {
-                "enable": False,
-                "method": "adaptive_gaussian",
-                "block_size": 15,  # 更大的块，更平滑的效果
-                "c_constant": 5,  # 更大的常数，保留更多细节
-            },
-            # 图像增强配置 - 减少处理强度
-            "enhancement": {
-                "enhance_contrast": True,
-                "reduce_noise": False,  # 关闭降噪，保持原始细节
-                "sharpen": False,  # 关闭锐化，避免过度处理
-                "gamma_correction": False,
-            },
-            # 输出配置
-            "output": {
-                "white_background": False,
-                "max_width": 2000,
-                "max_height": 2000,
-                "quality": 95,
-            },
-        }
+        # 倾斜角度缓存：按图像内容摘要索引，同一图像重复检测时跳过霍夫变换
+        self._skew_cache = OrderedDict()
+        self._skew_cache_lock = threading.Lock()
 
-        # 自然模式配置 - 最大程度保留原图特征，只做必要优化
-        self.natural_config = {
-            # 几何校正配置
-            "geometric": {
-                "enable_perspective": False,
-                "enable_deskew": True,
-                "enable_crop": True,
-            },
-            # 背景处理配置 - 最轻微的处理
-            "background": {
-                "method": "natural_enhancement",
-                "brightness_boost": 1.15,  # 提升亮度，改善背景白度
-                "contrast_boost": 1.05,  # 轻微增加对比度
-                "preserve_ratio": 0.5,  # 保留50%原图特征，允许更多白化
-            },
-            # 二值化配置
-            "binarization": {
-                "enable": False,
-                "method": "adaptive_gaussian",
-                "block_size": 21,
-                "c_constant": 8,
-            },
-            # 图像增强配置 - 最小化处理
-            "enhancement": {
-                "enhance_contrast": False,  # 关闭对比度增强
-                "reduce_noise": False,  # 关闭降噪
-                "sharpen": False,  # 关闭锐化
-                "gamma_correction": False,
-            },
-            # 输出配置
-            "output": {
-                "white_background": False,
-                "max_width": 2000,
-                "max_height": 2000,
-                "quality": 95,
-            },
-        }
+        # 预设处理配置为模块级只读常量，各实例共享，不再为每个实例重新构建
+        self.default_config = DEFAULT_CONFIG
+        self.balanced_config = BALANCED_CONFIG
+        self.natural_config = NATURAL_CONFIG
+        self.ultra_white_config = ULTRA_WHITE_CONFIG
 
-        # 超白模式配置 - 专门解决背景不够白净的问题
-        self.ultra_white_config = {
-            # 几何校正配置
-            "geometric": {
-                "enable_perspective": False,
-                "enable_deskew": True,
-                "enable_crop": True,
-            },
-            # 背景处理配置 - 超强白化
-            "background": {
-                "method": "ultra_whitening",
-                "kernel_size": 25,
-                "whitening_strength": 1.3,  # 强力白化
-                "background_threshold": 0.7,  # 背景检测阈值
-            },
-            # 二值化配置
-            "binarization": {
-                "enable": False,
-                "method": "adaptive_gaussian",
-                "block_size": 15,
-                "c_constant": 3,
-            },
-            # 图像增强配置 - 适度增强
-            "enhancement": {
-                "enhance_contrast": True,  # 开启对比度增强
-                "reduce_noise": False,  # 关闭降噪，保持清晰度
-                "sharpen": False,  # 关闭锐化，避免过度处理
-                "gamma_correction": False,
-            },
-            # 输出配置
-            "output": {
-                "white_background": False,  # 已经通过背景处理实现白化
-                "max_width": 2000,
-                "max_height": 2000,
-                "quality": 95,
-            },
-        }
+        if warmup:
+            self.warmup()
+
+    @cached_property
+    def geometric_corrector(self) -> GeometricCorrector:
+        """几何校正模块"""
+        return GeometricCorrector()
+
+    @cached_property
+    def background_processor(self) -> BackgroundProcessor:
+        """背景处理模块"""
+        return BackgroundProcessor()
+
+    @cached_property
+    def binarizer(self) -> Binarizer:
+        """二值化模块"""
+        return Binarizer()
+
+    @cached_property
+    def image_enhancer(self) -> ImageEnhancer:
+        """图像增强模块"""
+        return ImageEnhancer()
+
+    def warmup(self) -> None:
+        """
+        使用小尺寸图像运行一遍各预设配置和质量检测
+
+        OpenCV 内核分派、工作缓冲区、线程池等都在首次调用时才初始化，
+        预热后首次真实请求不再承担这部分延迟（约一两百毫秒）；
+        代价是初始化时多花同样的时间。
+        """
+        dummy = np.full((256, 192, 3), 200, dtype=np.uint8)
+        cv2.rectangle(dummy, (40, 60), (150, 200), (40, 40, 40), -1)
+
+        for config in (
+            self.default_config,
+            self.balanced_config,
+            self.natural_config,
+            self.ultra_white_config,
+        ):
+            self.scan_document(dummy, config)
+        self.detect_document_quality(dummy)
 
     def scan_document(
         self,
@@ -201,18 +376,28 @@ class DocumentScanner:
             Dict[str, Any]: 处理结果，包含最终图像和可选的中间结果
         """
         try:
-            logger.info("开始文档扫描处理流程")
+            logger.debug("开始文档扫描处理流程")
+
+            # 各步骤耗时（毫秒），处理完成后汇总为一条日志
+            timings = {}
+            step_start = time.perf_counter()
+
+            def mark(step: str) -> None:
+                nonlocal step_start
+                now = time.perf_counter()
+                timings[step] = round((now - step_start) * 1000, 1)
+                step_start = now
 
             # 合并配置
             processing_config = self._merge_config(config)
 
-            # 确保输入是OpenCV格式
-            if hasattr(image, "mode"):  # PIL Image check
-                cv_image = self.image_utils.pil_to_cv2(image)
-            else:
-                cv_image = image.copy()
+            # 确保输入是OpenCV格式，失败保护也统一返回ndarray
+            # 各处理步骤都返回新数组、不会原地修改输入，因此无需预先拷贝输入图像
+            if self._is_pil_image(image):
+                image = self.image_utils.pil_to_cv2(image)
+            cv_image = image
 
-            # 存储中间结果
+            # 存储中间结果（直接保存各步骤的输出，后续步骤不会修改它们，无需拷贝）
             intermediate_results = {}
 
             # 记录原始尺寸
@@ -222,12 +407,26 @@ class DocumentScanner:
             # 调整图像大小以提高处理速度
             max_width = processing_config["output"]["max_width"]
             max_height = processing_config["output"]["max_height"]
+            # 需要缩小时写入当前线程复用的缓冲区；缩小后的图像不会作为结果返回
+            # （恢复尺寸时会重新生成数组），只有保留中间结果时才单独分配
+            resize_dst = None
+            if not return_intermediate:
+                new_width, new_height, _ = self.image_utils.fit_size(
+                    original_width, original_height, max_width, max_height
+                )
+                if (new_width, new_height) != original_size:
+                    resize_dst = self._get_buffer(
+                        "resized",
+                        (new_height, new_width) + cv_image.shape[2:],
+                        cv_image.dtype,
+                    )
             resized_image, scale_factor = self.image_utils.resize_image(
-                cv_image, max_width, max_height
+                cv_image, max_width, max_height, dst=resize_dst
             )
 
+            mark("resize")
             if return_intermediate:
-                intermediate_results["01_resized"] = resized_image.copy()
+                intermediate_results["01_resized"] = resized_image
 
             current_image = resized_image
 
@@ -241,36 +440,50 @@ class DocumentScanner:
             #        intermediate_results['02_geometric_corrected'] = current_image.copy()
 
             # 步骤2: 背景处理
-            logger.info("执行背景处理...")
-            current_image = self.background_processor.process_background(
-                current_image, **processing_config["background"]
-            )
+            # 自然增强与仅含伽马校正的增强都是逐像素查找表，复合为一张表后一次完成
+            gamma_lut = self._fusable_gamma_lut(processing_config)
+            logger.debug("执行背景处理...")
+            if gamma_lut is not None:
+                current_image = self.background_processor.process_background(
+                    current_image, post_lut=gamma_lut, **processing_config["background"]
+                )
+            else:
+                current_image = self.background_processor.process_background(
+                    current_image, **processing_config["background"]
+                )
+            mark("background")
             if return_intermediate:
-                intermediate_results["03_background_processed"] = current_image.copy()
+                intermediate_results["03_background_processed"] = current_image
 
-            # 步骤3: 图像增强
-            if any(processing_config["enhancement"].values()):
-                logger.info("执行图像增强...")
+            # 步骤3: 图像增强（伽马校正已在背景处理中完成时跳过）
+            # enhance_image 按开关逐项执行，未启用的步骤完全跳过，其余配置项作为各步骤的参数
+            if gamma_lut is None and any(processing_config["enhancement"].values()):
+                logger.debug("执行图像增强...")
                 current_image = self.image_enhancer.enhance_image(
-                    current_image, **processing_config["enhancement"]
+                    current_image,
+                    # 当前图像是流水线自己生成的中间结果时，CLAHE 可直接写回
+                    inplace=not return_intermediate and current_image is not cv_image,
+                    **processing_config["enhancement"],
                 )
+                mark("enhancement")
                 if return_intermediate:
-                    intermediate_results["04_enhanced"] = current_image.copy()
+                    intermediate_results["04_enhanced"] = current_image
 
             # 步骤4: 创建白底文档（如果启用）
             if processing_config["output"]["white_background"]:
-                logger.info("创建白底文档...")
+                logger.debug("创建白底文档...")
                 current_image = (
                     self.background_processor.create_white_background_document(
                         current_image
                     )
                 )
+                mark("white_background")
                 if return_intermediate:
-                    intermediate_results["05_white_background"] = current_image.copy()
+                    intermediate_results["05_white_background"] = current_image
 
             # 步骤5: 二值化（如果启用）
             if processing_config["binarization"]["enable"]:
-                logger.info("执行二值化...")
+                logger.debug("执行二值化...")
                 current_image = self.binarizer.binarize(
                     current_image,
                     **{
@@ -279,20 +492,34 @@ class DocumentScanner:
                         if k != "enable"
                     },
                 )
+                mark("binarization")
                 if return_intermediate:
-                    intermediate_results["06_binarized"] = current_image.copy()
-
-            # 步骤6: 恢复原始尺寸（如果需要）
+                    intermediate_results["06_binarized"] = current_image
+
+            # 步骤6: 裁剪白色边框并恢复原始尺寸（如果需要）
+            # 未显式配置 auto_crop 时，只有白底或二值化输出才会出现需要裁剪的白色边框
+            auto_crop = processing_config["output"].get("auto_crop")
+            if auto_crop is None:
+                auto_crop = (
+                    processing_config["output"]["white_background"]
+                    or processing_config["binarization"]["enable"]
+                )
             if scale_factor != 1.0:
-                logger.info("恢复原始尺寸...")
-                current_image = self.image_utils.restore_size(
-                    current_image, original_size, scale_factor
+                logger.debug("恢复原始尺寸...")
+                if auto_crop:
+                    # 在缩小后的图像上确定裁剪区域，只放大裁剪后的部分
+                    final_image = self._crop_and_restore(current_image, original_size)
+                else:
+                    final_image = self.image_utils.restore_size(
+                        current_image, original_size, scale_factor
+                    )
+            elif auto_crop:
+                final_image = self.geometric_corrector.auto_crop_white_borders(
+                    current_image
                 )
-
-            # 最终裁剪白色边框
-            final_image = self.geometric_corrector.auto_crop_white_borders(
-                current_image
-            )
+            else:
+                final_image = current_image
+            mark("crop")
 
             # 构建返回结果
             result = {
@@ -307,7 +534,10 @@ class DocumentScanner:
                 result["intermediate_results"] = intermediate_results
 
             logger.info(
-                f"文档扫描处理完成，从 {original_size} 处理到 {final_image.shape[:2]}"
+                "文档扫描处理完成，从 %s 处理到 %s，各步骤耗时(ms): %s",
+                original_size,
+                final_image.shape[:2],
+                timings,
             )
             return result
 
@@ -319,7 +549,7 @@ class DocumentScanner:
                 "original_size": image.shape[:2] if hasattr(image, "shape") else (0, 0),
                 "final_size": image.shape[:2] if hasattr(image, "shape") else (0, 0),
                 "scale_factor": 1.0,
-                "processing_config": self.default_config,
+                "processing_config": self._copy_config(self.default_config),
                 "error": str(e),
             }
 
@@ -432,17 +662,51 @@ class DocumentScanner:
         try:
             logger.info("开始文档质量检测")
 
-            # 转换为灰度图进行分析
+            if self._is_pil_image(image):
+                image = self.image_utils.pil_to_cv2(image)
+
+            # 以绿色通道近似灰度图进行分析：绿色通道在亮度中权重最大，
+            # 对清晰度、光照、倾斜等启发式统计足够，省去一次颜色转换
+            # （中间结果均写入当前线程复用的缓冲区，只读不改输入）
+            height, width = image.shape[:2]
             if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+                gray = cv2.extractChannel(
+                    image,
+                    1,
+                    dst=self._get_buffer("quality_gray", (height, width), image.dtype),
+                )
+            else:
+                gray = image
+
+            # 光照、倾斜和对比度只依赖低频/大尺度结构，在缩小到长边约 1024 的图像上统计即可；
+            # 清晰度依赖像素级细节，仍在原图上计算，阈值保持不变
+            analysis_scale = min(QUALITY_ANALYSIS_SIZE / max(height, width), 1.0)
+            if analysis_scale < 1.0:
+                small_size = (
+                    max(1, round(width * analysis_scale)),
+                    max(1, round(height * analysis_scale)),
+                )
+                small_gray = cv2.resize(
+                    gray,
+                    small_size,
+                    dst=self._get_buffer(
+                        "quality_small_gray", small_size[::-1], gray.dtype
+                    ),
+                    interpolation=cv2.INTER_AREA,
+                )
             else:
-                gray = image.copy()
+                small_gray = gray
 
             quality_report = {}
 
             # 1. 检测模糊程度
-            laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-            laplacian_var = float(np.var(laplacian.astype(np.float64)))
+            # 统计量均由 meanStdDev 一次扫描得到（内部以 float64 累加），无需先转换为 float64 副本
+            laplacian = cv2.Laplacian(
+                gray,
+                cv2.CV_64F,
+                dst=self._get_buffer("quality_laplacian", gray.shape, np.float64),
+            )
+            laplacian_var = float(cv2.meanStdDev(laplacian)[1][0, 0]) ** 2
             quality_report["sharpness"] = {
                 "score": min(laplacian_var / 1000, 1.0),
                 "level": "good" if laplacian_var > 500 else "poor",
@@ -451,9 +715,15 @@ class DocumentScanner:
                 else "图像清晰度可接受",
             }
 
-            # 2. 检测光照均匀性
-            blur = cv2.GaussianBlur(gray, (21, 21), 0)
-            illumination_var = float(np.var(blur.astype(np.float64)))
+            # 2. 检测光照均匀性（模糊核随缩放比例缩小，覆盖相同的原图范围）
+            blur_size = max(3, int(21 * analysis_scale) | 1)
+            blur = cv2.GaussianBlur(
+                small_gray,
+                (blur_size, blur_size),
+                0,
+                dst=self._get_buffer("quality_blur", small_gray.shape, small_gray.dtype),
+            )
+            illumination_var = float(cv2.meanStdDev(blur)[1][0, 0]) ** 2
             quality_report["illumination"] = {
                 "score": max(0, 1.0 - illumination_var / 5000),
                 "level": "good" if illumination_var < 2000 else "poor",
@@ -463,7 +733,7 @@ class DocumentScanner:
             }
 
             # 3. 检测倾斜程度
-            skew_angle = abs(self.image_utils.calculate_skew_angle(gray))
+            skew_angle = abs(self._cached_skew_angle(small_gray))
             quality_report["skew"] = {
                 "angle": skew_angle,
                 "level": "good" if skew_angle < 2 else "poor",
@@ -473,7 +743,7 @@ class DocumentScanner:
             }
 
             # 4. 检测对比度
-            contrast = float(np.std(gray.astype(np.float64)))
+            contrast = float(cv2.meanStdDev(small_gray)[1][0, 0])
             quality_report["contrast"] = {
                 "score": min(contrast / 100, 1.0),
                 "level": "good" if contrast > 50 else "poor",
@@ -482,12 +752,15 @@ class DocumentScanner:
                 else "对比度良好",
             }
 
-            # 5. 整体质量评分
-            overall_score = (
-                quality_report["sharpness"]["score"] * 0.3
-                + quality_report["illumination"]["score"] * 0.3
-                + (1.0 if skew_angle < 2 else 0.5) * 0.2
-                + quality_report["contrast"]["score"] * 0.2
+            # 5. 整体质量评分（按权重表加权求和）
+            scores = {
+                "sharpness": quality_report["sharpness"]["score"],
+                "illumination": quality_report["illumination"]["score"],
+                "skew": 1.0 if skew_angle < 2 else 0.5,
+                "contrast": quality_report["contrast"]["score"],
+            }
+            overall_score = sum(
+                weight * scores[name] for name, weight in QUALITY_WEIGHTS.items()
             )
 
             quality_report["overall"] = {
@@ -507,6 +780,150 @@ class DocumentScanner:
             logger.error(f"文档质量检测失败: {str(e)}")
             return {"error": str(e)}
 
+    def _cached_skew_angle(self, gray: np.ndarray) -> float:
+        """
+        计算灰度图的倾斜角度，结果按图像内容缓存
+
+        灰度图来自复用缓冲区，数组对象本身不能作为缓存键，
+        因此使用内容摘要（约为霍夫直线检测耗时的十分之一）
+
+        Args:
+            gray: 灰度图像
+
+        Returns:
+            float: 偏斜角度（度）
+        """
+        key = (
+            gray.shape,
+            hashlib.blake2b(np.ascontiguousarray(gray).data, digest_size=16).digest(),
+        )
+        with self._skew_cache_lock:
+            angle = self._skew_cache.get(key)
+            if angle is not None:
+                self._skew_cache.move_to_end(key)
+                return angle
+
+        angle = self.image_utils.calculate_skew_angle(gray)
+
+        with self._skew_cache_lock:
+            self._skew_cache[key] = angle
+            if len(self._skew_cache) > SKEW_CACHE_SIZE:
+                self._skew_cache.popitem(last=False)
+        return angle
+
+    def _get_buffer(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """
+        获取当前线程的可复用缓冲区
+
+        每个名称只保留最近一次的尺寸，尺寸或类型变化时重新分配
+
+        Args:
+            name: 缓冲区名称
+            shape: 数组形状
+            dtype: 数据类型
+
+        Returns:
+            np.ndarray: 缓冲区数组
+        """
+        buffers = getattr(self._workspace, "buffers", None)
+        if buffers is None:
+            buffers = self._workspace.buffers = {}
+
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = buffers[name] = np.empty(shape, dtype=dtype)
+        return buffer
+
+    @staticmethod
+    def _is_pil_image(image: Any) -> bool:
+        """
+        判断输入是否为PIL图像
+
+        管道内部统一使用 BGR uint8 ndarray，PIL图像只在入口处转换一次
+        """
+        return hasattr(image, "mode") and not isinstance(image, np.ndarray)
+
+    def _fusable_gamma_lut(self, processing_config: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        判断背景处理与图像增强能否融合为一次查表，可以时返回伽马校正查找表
+
+        只有背景处理为自然增强、图像增强只启用伽马校正时二者都是逐像素映射
+
+        Args:
+            processing_config: 合并后的处理配置
+
+        Returns:
+            Optional[np.ndarray]: 伽马校正查找表，不能融合时返回 None
+        """
+        if processing_config["background"].get("method") != "natural_enhancement":
+            return None
+
+        enhancement = processing_config["enhancement"]
+        # 与 enhance_image 的参数默认值保持一致
+        if not enhancement.get("gamma_correction", False) or any(
+            enhancement.get(flag, True)
+            for flag in ("enhance_contrast", "reduce_noise", "sharpen")
+        ):
+            return None
+
+        # 其余参数只允许伽马值，其他参数在原流程中会传给伽马校正并导致其失败
+        extra_params = set(enhancement) - {
+            "enhance_contrast", "reduce_noise", "sharpen", "gamma_correction"
+        }
+        if not extra_params <= {"gamma"}:
+            return None
+
+        return self.image_enhancer.gamma_table(enhancement.get("gamma", 1.2))
+
+    @staticmethod
+    def _copy_config(config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        复制两层结构的配置字典（节 -> 参数），参数值本身为不可变标量，无需深拷贝
+
+        Args:
+            config: 配置字典
+
+        Returns:
+            Dict[str, Any]: 各节独立的配置副本
+        """
+        return {
+            section: dict(settings) if isinstance(settings, Mapping) else settings
+            for section, settings in config.items()
+        }
+
+    def _crop_and_restore(
+        self, image: np.ndarray, original_size: Tuple[int, int]
+    ) -> np.ndarray:
+        """
+        在处理尺寸下裁剪白色边框，再将裁剪区域放大到原始尺寸下对应的大小
+
+        Args:
+            image: 处理尺寸下的图像
+            original_size: 原始尺寸 (width, height)
+
+        Returns:
+            np.ndarray: 裁剪并恢复尺寸后的图像
+        """
+        height, width = image.shape[:2]
+        scale_x = original_size[0] / width
+        scale_y = original_size[1] / height
+
+        bounds = self.geometric_corrector.find_content_bounds(image)
+        if bounds is None:
+            return self.image_utils.restore_size(image, original_size, scale_x)
+
+        # 将裁剪矩形映射到原始尺寸
+        x, y, w, h = bounds
+        x0 = int(x * scale_x)
+        y0 = int(y * scale_y)
+        x1 = min(int(np.ceil((x + w) * scale_x)), original_size[0])
+        y1 = min(int(np.ceil((y + h) * scale_y)), original_size[1])
+
+        cropped = image[y:y + h, x:x + w]
+        return self.image_utils.restore_size(
+            cropped, (max(x1 - x0, 1), max(y1 - y0, 1)), scale_x
+        )
+
     def _merge_config(self, user_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """
         合并用户配置和默认配置
@@ -517,14 +934,16 @@ class DocumentScanner:
         Returns:
             Dict[str, Any]: 合并后的配置
         """
-        if user_config is None:
-            return self.default_config.copy()
+        # 按节复制：dict.copy() 是浅拷贝，直接 update 嵌套的节会改写 default_config，
+        # 使一次调用的配置泄漏到之后所有使用默认配置的调用中
+        merged_config = self._copy_config(self.default_config)
 
-        merged_config = self.default_config.copy()
+        if user_config is None:
+            return merged_config
 
         for section, settings in user_config.items():
             if section in merged_config:
-                if isinstance(settings, dict):
+                if isinstance(settings, Mapping) and isinstance(merged_config[section], dict):
                     merged_config[section].update(settings)
                 else:
                     merged_config[section] = settings
@@ -567,23 +986,33 @@ class DocumentScanner:
         images: List[np.ndarray],
         config: Optional[Dict[str, Any]] = None,
         progress_callback: Optional[callable] = None,
+        max_workers: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         """
         批量处理多个文档图像
 
+        多个图像时使用进程池并行处理，每个图像的处理管道相互独立
+
         Args:
             images: 图像列表
             config: 处理配置
-            progress_callback: 进度回调函数
+            progress_callback: 进度回调函数，按完成顺序调用 (已完成数, 总数)
+            max_workers: 最大工作进程数，默认使用CPU核数；为1时在当前进程内顺序处理
 
         Returns:
-            List[Dict[str, Any]]: 处理结果列表
+            List[Dict[str, Any]]: 与输入顺序一致的处理结果列表
         """
-        results = []
         total_images = len(images)
 
         logger.info(f"开始批量处理 {total_images} 个图像")
 
+        workers = max_workers or os.cpu_count() or 1
+        if min(workers, total_images) > 1:
+            results = self._batch_process_parallel(images, config, progress_callback, workers)
+            logger.info("批量处理完成")
+            return results
+
+        results = []
         for i, image in enumerate(images):
             try:
                 logger.info(f"处理第 {i + 1}/{total_images} 个图像")
@@ -601,6 +1030,83 @@ class DocumentScanner:
         logger.info("批量处理完成")
         return results
 
+    def _batch_process_parallel(
+        self,
+        images: List[np.ndarray],
+        config: Optional[Dict[str, Any]],
+        progress_callback: Optional[callable],
+        workers: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        使用进程池并行处理多个图像
+
+        工作进程中的扫描器使用模块默认配置，因此先按当前实例合并出完整配置再发送，
+        保证实例上自定义的默认配置同样生效
+
+        Args:
+            images: 图像列表
+            config: 处理配置
+            progress_callback: 进度回调函数
+            workers: 工作进程数
+
+        Returns:
+            List[Dict[str, Any]]: 与输入顺序一致的处理结果列表
+        """
+        total_images = len(images)
+        results: List[Optional[Dict[str, Any]]] = [None] * total_images
+        processing_config = self._merge_config(config)
+
+        def submit_all(executor: ProcessPoolExecutor) -> Dict[Any, int]:
+            return {
+                executor.submit(_scan_one, image, processing_config): i
+                for i, image in enumerate(images)
+            }
+
+        executor = _get_process_pool(workers)
+        try:
+            futures = submit_all(executor)
+        except BrokenProcessPool:
+            # 复用的进程池已损坏，重建后重新提交
+            _discard_process_pool(executor)
+            executor = _get_process_pool(workers)
+            futures = submit_all(executor)
+
+        for completed, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    _discard_process_pool(executor)
+                logger.error(f"处理第 {i + 1} 个图像失败: {str(e)}")
+                results[i] = {"error": str(e), "final_image": images[i]}
+
+            if progress_callback:
+                progress_callback(completed, total_images)
+
+        return results
+
+    @staticmethod
+    def configure_threading(mode: str = "single") -> None:
+        """
+        配置当前进程中 OpenCV 的内部线程数
+
+        OpenCV 的线程设置作用于整个进程。由外部并行调度多个扫描任务
+        （例如自行管理的进程池或线程池）时使用 "batch"，避免与 OpenCV
+        内部线程池相互争用；单个任务独占机器时使用 "single" 恢复默认线程数。
+        batch_process 的工作进程会自动以单线程运行，无需调用本方法。
+
+        Args:
+            mode: 线程模式 ("batch", "single")
+        """
+        if mode == "batch":
+            cv2.setNumThreads(1)
+        elif mode == "single":
+            # 负数表示恢复为 OpenCV 的默认线程数
+            cv2.setNumThreads(-1)
+        else:
+            logger.warning(f"未知的线程模式: {mode}，保持当前设置")
+
     def get_supported_formats(self) -> List[str]:
         """
         获取支持的图像格式
@@ -617,7 +1123,7 @@ class DocumentScanner:
         Returns:
             Dict[str, Any]: 默认配置字典
         """
-        return self.default_config.copy()
+        return self._copy_config(self.default_config)
 
     def get_balanced_config(self) -> Dict[str, Any]:
         """
@@ -626,7 +1132,7 @@ class DocumentScanner:
         Returns:
             Dict[str, Any]: 平衡配置字典
         """
-        return self.balanced_config.copy()
+        return self._copy_config(self.balanced_config)
 
     def get_natural_config(self) -> Dict[str, Any]:
         """
@@ -635,7 +1141,7 @@ class DocumentScanner:
         Returns:
             Dict[str, Any]: 自然配置字典
         """
-        return self.natural_config.copy()
+        return self._copy_config(self.natural_config)
 
     def get_ultra_white_config(self) -> Dict[str, Any]:
         """
@@ -644,4 +1150,4 @@ class DocumentScanner:
         Returns:
             Dict[str, Any]: 超白配置字典
         """
-        return self.ultra_white_config.copy()
+        return self._copy_config(self.ultra_white_config)
@@ -11,24 +11,56 @@
 
 import cv2
 import numpy as np
-from typing import Tuple, Optional, Union, Dict, Any
+from functools import lru_cache
+from typing import Tuple, Optional, Union, Dict, Any, List, Callable
 import logging
 from .utils import ImageUtils
 
 logger = logging.getLogger(__name__)
 
+# 自动增强特征分析所用缩略图的最大边长
+FEATURE_ANALYSIS_SIZE = 256
+
 
 class ImageEnhancer:
     """图像质量增强器类"""
     
-    def __init__(self):
+    def __init__(self, use_cuda: bool = False):
+        """
+        Args:
+            use_cuda: 是否在 OpenCV 带 CUDA 且有可用设备时，将双边滤波和 CLAHE 放到 GPU 上执行
+        """
         self.image_utils = ImageUtils()
+        
+        # 各类增强方法的分派表
+        self._noise_methods = {
+            "gaussian": self.gaussian_denoise,
+            "bilateral": self.bilateral_denoise,
+            "median": self.median_denoise,
+            "non_local_means": self.non_local_means_denoise,
+        }
+        self._contrast_methods = {
+            "clahe": self.clahe_enhancement,
+            "histogram_equalization": self.histogram_equalization,
+            "adaptive_equalization": self.adaptive_histogram_equalization,
+        }
+        self._sharpen_methods = {
+            "unsharp_mask": self.unsharp_mask_sharpen,
+            "laplacian": self.laplacian_sharpen,
+            "custom_kernel": self.custom_kernel_sharpen,
+        }
+        
+        # 可选的 GPU 后端，任一 GPU 调用失败时回退到 CPU
+        self._use_cuda = use_cuda and self.image_utils.cuda_device_available()
+        if self._use_cuda:
+            logger.info("检测到CUDA设备，双边滤波和CLAHE将使用GPU加速")
     
     def enhance_image(self, image: np.ndarray,
                      enhance_contrast: bool = True,
                      reduce_noise: bool = True,
                      sharpen: bool = True,
                      gamma_correction: bool = False,
+                     inplace: bool = False,
                      **kwargs) -> np.ndarray:
         """
         对图像进行完整的质量增强
@@ -39,42 +71,71 @@ class ImageEnhancer:
             reduce_noise: 是否降噪
             sharpen: 是否锐化
             gamma_correction: 是否进行伽马校正
+            inplace: 输入图像可以被改写时（例如调用方自己生成的中间结果）设为 True，
+                     CLAHE 对比度增强直接写回，省去一次整幅分配
             **kwargs: 各种方法的参数
             
         Returns:
             np.ndarray: 增强后的图像
         """
         try:
-            logger.info("开始图像质量增强")
-            result = image.copy()
+            logger.debug("开始图像质量增强")
+            # 各增强步骤都返回新数组、不会原地修改输入，因此无需预先拷贝
+            result = image
             
             # 1. 降噪（如果启用）
             if reduce_noise:
-                logger.info("应用降噪处理...")
+                logger.debug("应用降噪处理...")
                 result = self.reduce_noise(result, **kwargs)
             
             # 2. 对比度增强（如果启用）
+            # 降噪已生成新数组或允许改写输入时，CLAHE 可直接写回该数组
             if enhance_contrast:
-                logger.info("应用对比度增强...")
-                result = self.enhance_contrast(result, **kwargs)
+                logger.debug("应用对比度增强...")
+                if (inplace or result is not image) and kwargs.get("method", "clahe") == "clahe":
+                    result = self.enhance_contrast(result, inplace=True, **kwargs)
+                else:
+                    result = self.enhance_contrast(result, **kwargs)
             
             # 3. 锐化（如果启用）
             if sharpen:
-                logger.info("应用锐化处理...")
+                logger.debug("应用锐化处理...")
                 result = self.sharpen_image(result, **kwargs)
             
             # 4. 伽马校正（如果启用）
             if gamma_correction:
-                logger.info("应用伽马校正...")
+                logger.debug("应用伽马校正...")
                 result = self.gamma_correction(result, **kwargs)
             
-            logger.info("图像质量增强完成")
+            logger.info(
+                "图像质量增强完成，降噪=%s，对比度增强=%s，锐化=%s，伽马校正=%s",
+                reduce_noise, enhance_contrast, sharpen, gamma_correction,
+            )
             return result
             
         except Exception as e:
             logger.error(f"图像质量增强失败: {str(e)}")
             return image
     
+    def enhance_batch(self, images: List[np.ndarray],
+                      max_workers: Optional[int] = None,
+                      **kwargs) -> List[np.ndarray]:
+        """
+        批量增强多页图像
+        
+        各页在线程池中并行处理，批量期间 OpenCV 以单线程运行（见 ImageUtils.map_batch）
+        
+        Args:
+            images: 输入图像列表
+            max_workers: 最大线程数，默认使用CPU核数
+            **kwargs: 增强参数，同 enhance_image
+            
+        Returns:
+            List[np.ndarray]: 与输入顺序一致的增强结果
+        """
+        return self.image_utils.map_batch(
+            lambda image: self.enhance_image(image, **kwargs), images, max_workers)
+    
     def reduce_noise(self, image: np.ndarray,
                     method: str = "bilateral",
                     **kwargs) -> np.ndarray:
@@ -90,17 +151,11 @@ class ImageEnhancer:
             np.ndarray: 降噪后的图像
         """
         try:
-            if method == "gaussian":
-                return self.gaussian_denoise(image, **kwargs)
-            elif method == "bilateral":
-                return self.bilateral_denoise(image, **kwargs)
-            elif method == "median":
-                return self.median_denoise(image, **kwargs)
-            elif method == "non_local_means":
-                return self.non_local_means_denoise(image, **kwargs)
-            else:
+            denoise = self._noise_methods.get(method)
+            if denoise is None:
                 logger.warning(f"未知的降噪方法: {method}，使用双边滤波")
-                return self.bilateral_denoise(image, **kwargs)
+                denoise = self.bilateral_denoise
+            return denoise(image, **kwargs)
                 
         except Exception as e:
             logger.error(f"降噪处理失败: {str(e)}")
@@ -128,7 +183,7 @@ class ImageEnhancer:
                 kernel_size += 1
             
             result = cv2.GaussianBlur(image, (kernel_size, kernel_size), sigma_x, sigmaY=sigma_y)
-            logger.debug(f"高斯降噪完成，kernel_size={kernel_size}")
+            logger.debug("高斯降噪完成，kernel_size=%s", kernel_size)
             return result
             
         except Exception as e:
@@ -154,8 +209,17 @@ class ImageEnhancer:
             np.ndarray: 降噪后的图像
         """
         try:
-            result = cv2.bilateralFilter(image, d, sigma_color, sigma_space)
-            logger.debug(f"双边滤波降噪完成，d={d}, sigma_color={sigma_color}")
+            result = None
+            if self._use_cuda and d > 0:
+                try:
+                    gpu_image = cv2.cuda_GpuMat()
+                    gpu_image.upload(image)
+                    result = cv2.cuda.bilateralFilter(gpu_image, d, sigma_color, sigma_space).download()
+                except cv2.error as e:
+                    logger.warning(f"GPU双边滤波失败，回退到CPU: {str(e)}")
+            if result is None:
+                result = cv2.bilateralFilter(image, d, sigma_color, sigma_space)
+            logger.debug("双边滤波降噪完成，d=%s, sigma_color=%s", d, sigma_color)
             return result
             
         except Exception as e:
@@ -182,7 +246,7 @@ class ImageEnhancer:
                 kernel_size += 1
             
             result = cv2.medianBlur(image, kernel_size)
-            logger.debug(f"中值滤波降噪完成，kernel_size={kernel_size}")
+            logger.debug("中值滤波降噪完成，kernel_size=%s", kernel_size)
             return result
             
         except Exception as e:
@@ -206,16 +270,15 @@ class ImageEnhancer:
             np.ndarray: 降噪后的图像
         """
         try:
-            if len(image.shape) == 3:
-                result = cv2.fastNlMeansDenoisingColored(
-                    image, None, h, h, template_window_size, search_window_size
-                )
-            else:
-                result = cv2.fastNlMeansDenoising(
-                    image, None, h, template_window_size, search_window_size
+            # 彩色图像只对LAB的L通道降噪：文档图像的噪声主要体现在亮度上，
+            # 单通道非局部均值的计算量约为彩色版本的三分之一
+            result = self._enhance_in_lab(image, [
+                lambda l: cv2.fastNlMeansDenoising(
+                    l, None, h, template_window_size, search_window_size
                 )
+            ])
             
-            logger.debug(f"非局部均值降噪完成，h={h}")
+            logger.debug("非局部均值降噪完成，h=%s", h)
             return result
             
         except Exception as e:
@@ -237,15 +300,11 @@ class ImageEnhancer:
             np.ndarray: 对比度增强后的图像
         """
         try:
-            if method == "clahe":
-                return self.clahe_enhancement(image, **kwargs)
-            elif method == "histogram_equalization":
-                return self.histogram_equalization(image, **kwargs)
-            elif method == "adaptive_equalization":
-                return self.adaptive_histogram_equalization(image, **kwargs)
-            else:
+            enhance = self._contrast_methods.get(method)
+            if enhance is None:
                 logger.warning(f"未知的对比度增强方法: {method}，使用CLAHE")
-                return self.clahe_enhancement(image, **kwargs)
+                enhance = self.clahe_enhancement
+            return enhance(image, **kwargs)
                 
         except Exception as e:
             logger.error(f"对比度增强失败: {str(e)}")
@@ -253,7 +312,8 @@ class ImageEnhancer:
     
     def clahe_enhancement(self, image: np.ndarray,
                          clip_limit: float = 2.0,
-                         tile_grid_size: Tuple[int, int] = (8, 8)) -> np.ndarray:
+                         tile_grid_size: Tuple[int, int] = (8, 8),
+                         inplace: bool = False) -> np.ndarray:
         """
         CLAHE (Contrast Limited Adaptive Histogram Equalization) 增强
         
@@ -261,29 +321,58 @@ class ImageEnhancer:
             image: 输入图像
             clip_limit: 对比度限制阈值
             tile_grid_size: 网格大小
+            inplace: 是否将结果直接写回输入图像（调用方不再需要原图时使用，省去一次整图分配）
             
         Returns:
             np.ndarray: 增强后的图像
         """
         try:
-            clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
+            dst = image if inplace and image.flags.writeable else None
             
             if len(image.shape) == 3:
                 # 彩色图像：在LAB色彩空间的L通道应用CLAHE
                 lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-                lab[:, :, 0] = clahe.apply(lab[:, :, 0])
-                result = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+                lab[:, :, 0] = self._apply_clahe(lab[:, :, 0], clip_limit, tile_grid_size)
+                result = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=dst)
             else:
                 # 灰度图像直接应用
-                result = clahe.apply(image)
+                result = self._apply_clahe(image, clip_limit, tile_grid_size, dst=dst)
             
-            logger.debug(f"CLAHE增强完成，clip_limit={clip_limit}")
+            logger.debug("CLAHE增强完成，clip_limit=%s", clip_limit)
             return result
             
         except Exception as e:
             logger.error(f"CLAHE增强失败: {str(e)}")
             return image
     
+    def _apply_clahe(self, plane: np.ndarray,
+                     clip_limit: float,
+                     tile_grid_size: Tuple[int, int],
+                     dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        对单通道图像应用CLAHE，启用 GPU 时优先在 GPU 上执行，失败则回退到 CPU
+        
+        Args:
+            plane: 单通道 uint8 图像
+            clip_limit: 对比度限制阈值
+            tile_grid_size: 网格大小
+            dst: 可选的输出数组（仅 CPU 路径使用）
+            
+        Returns:
+            np.ndarray: 增强后的单通道图像
+        """
+        if self._use_cuda:
+            try:
+                gpu_plane = cv2.cuda_GpuMat()
+                gpu_plane.upload(np.ascontiguousarray(plane))
+                clahe = cv2.cuda.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
+                return clahe.apply(gpu_plane, cv2.cuda.Stream_Null()).download()
+            except cv2.error as e:
+                logger.warning(f"GPU CLAHE失败，回退到CPU: {str(e)}")
+        
+        clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
+        return clahe.apply(plane, dst=dst)
+    
     def histogram_equalization(self, image: np.ndarray) -> np.ndarray:
         """
         直方图均衡化
@@ -335,7 +424,7 @@ class ImageEnhancer:
                 # 灰度图像
                 result = clahe.apply(image)
             
-            logger.debug(f"自适应直方图均衡化完成，window_size={window_size}")
+            logger.debug("自适应直方图均衡化完成，window_size=%s", window_size)
             return result
             
         except Exception as e:
@@ -357,15 +446,11 @@ class ImageEnhancer:
             np.ndarray: 锐化后的图像
         """
         try:
-            if method == "unsharp_mask":
-                return self.unsharp_mask_sharpen(image, **kwargs)
-            elif method == "laplacian":
-                return self.laplacian_sharpen(image, **kwargs)
-            elif method == "custom_kernel":
-                return self.custom_kernel_sharpen(image, **kwargs)
-            else:
+            sharpen = self._sharpen_methods.get(method)
+            if sharpen is None:
                 logger.warning(f"未知的锐化方法: {method}，使用非锐化掩模")
-                return self.unsharp_mask_sharpen(image, **kwargs)
+                sharpen = self.unsharp_mask_sharpen
+            return sharpen(image, **kwargs)
                 
         except Exception as e:
             logger.error(f"图像锐化失败: {str(e)}")
@@ -391,24 +476,25 @@ class ImageEnhancer:
             # 创建模糊版本
             blurred = cv2.GaussianBlur(image, (0, 0), sigma)
             
-            # 计算差异
-            if len(image.shape) == 3:
-                diff = image.astype(np.float32) - blurred.astype(np.float32)
-            else:
-                diff = image.astype(np.float32) - blurred.astype(np.float32)
+            # 计算差异（uint8 相减直接输出 float32，结果为精确整数）
+            diff = cv2.subtract(image, blurred, dtype=cv2.CV_32F)
             
-            # 应用阈值
+            # 应用阈值：差异小于阈值的像素不锐化
             if threshold > 0:
-                mask = np.abs(diff) >= threshold
-                diff = diff * mask
+                _, below = cv2.threshold(cv2.absdiff(image, blurred), threshold - 1, 1,
+                                         cv2.THRESH_BINARY_INV)
+                np.copyto(diff, 0, where=below.view(bool))
             
-            # 应用锐化
-            sharpened = image.astype(np.float32) + strength * diff
+            # 应用锐化: image + strength * diff，在差异数组上原地完成；
+            # 保持浮点运算后截断取整，与逐项计算的结果一致
+            diff *= strength
+            diff += image
             
             # 限制像素值范围
-            result = np.clip(sharpened, 0, 255).astype(np.uint8)
+            np.clip(diff, 0, 255, out=diff)
+            result = diff.astype(np.uint8)
             
-            logger.debug(f"非锐化掩模锐化完成，sigma={sigma}, strength={strength}")
+            logger.debug("非锐化掩模锐化完成，sigma=%s, strength=%s", sigma, strength)
             return result
             
         except Exception as e:
@@ -433,16 +519,13 @@ class ImageEnhancer:
                               [-1, 5, -1],
                               [0, -1, 0]])
             
-            # 应用卷积
-            if len(image.shape) == 3:
-                sharpened = cv2.filter2D(image, -1, kernel)
-            else:
-                sharpened = cv2.filter2D(image, -1, kernel)
+            # 应用卷积（结果饱和截断到 0-255）
+            sharpened = cv2.filter2D(image, -1, kernel)
             
             # 混合原图和锐化图
             result = cv2.addWeighted(image, 1 - strength, sharpened, strength, 0)
             
-            logger.debug(f"拉普拉斯锐化完成，strength={strength}")
+            logger.debug("拉普拉斯锐化完成，strength=%s", strength)
             return result
             
         except Exception as e:
@@ -470,19 +553,39 @@ class ImageEnhancer:
                                   [-1,  9, -1],
                                   [-1, -1, -1]])
             
-            # 应用卷积
+            # 应用卷积（结果饱和截断到 0-255）
             sharpened = cv2.filter2D(image, -1, kernel)
             
             # 混合原图和锐化图
             result = cv2.addWeighted(image, 1 - strength, sharpened, strength, 0)
             
-            logger.debug(f"自定义核锐化完成，strength={strength}")
+            logger.debug("自定义核锐化完成，strength=%s", strength)
             return result
             
         except Exception as e:
             logger.error(f"自定义核锐化失败: {str(e)}")
             return image
     
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def gamma_table(gamma: float = 1.2) -> np.ndarray:
+        """
+        构建伽马校正查找表
+        
+        按伽马值缓存，批量处理中相同的伽马值不再重复构建；
+        返回的数组为只读，由各调用方共享
+        
+        Args:
+            gamma: 伽马值（>1提亮，<1变暗）
+            
+        Returns:
+            np.ndarray: 256 项 uint8 查找表
+        """
+        inv_gamma = 1.0 / gamma
+        table = ((np.arange(256) / 255.0) ** inv_gamma * 255).astype(np.uint8)
+        table.flags.writeable = False
+        return table
+    
     def gamma_correction(self, image: np.ndarray,
                         gamma: float = 1.2) -> np.ndarray:
         """
@@ -497,14 +600,12 @@ class ImageEnhancer:
         """
         try:
             # 构建查找表
-            inv_gamma = 1.0 / gamma
-            table = np.array([((i / 255.0) ** inv_gamma) * 255 
-                             for i in np.arange(0, 256)]).astype(np.uint8)
+            table = self.gamma_table(gamma)
             
             # 应用查找表
             result = cv2.LUT(image, table)
             
-            logger.debug(f"伽马校正完成，gamma={gamma}")
+            logger.debug("伽马校正完成，gamma=%s", gamma)
             return result
             
         except Exception as e:
@@ -527,19 +628,68 @@ class ImageEnhancer:
         """
         try:
             result = cv2.convertScaleAbs(image, alpha=alpha, beta=beta)
-            logger.debug(f"亮度对比度调整完成，alpha={alpha}, beta={beta}")
+            logger.debug("亮度对比度调整完成，alpha=%s, beta=%s", alpha, beta)
             return result
             
         except Exception as e:
             logger.error(f"亮度对比度调整失败: {str(e)}")
             return image
     
-    def enhance_text_clarity(self, image: np.ndarray) -> np.ndarray:
+    def apply_lut_pipeline(self, image: np.ndarray,
+                           alpha: float = 1.0,
+                           beta: int = 0,
+                           gamma: float = 1.0) -> np.ndarray:
+        """
+        伽马校正后再调整亮度和对比度，合并为一张查找表一次完成
+        
+        结果与依次调用 gamma_correction 和 adjust_brightness_contrast 完全一致，
+        但只需一次整图遍历
+        
+        Args:
+            image: 输入图像
+            alpha: 对比度调整因子
+            beta: 亮度调整值
+            gamma: 伽马值（>1提亮，<1变暗）
+            
+        Returns:
+            np.ndarray: 调整后的图像
+        """
+        try:
+            table = cv2.convertScaleAbs(self.gamma_table(gamma), alpha=alpha, beta=beta)
+            result = cv2.LUT(image, table)
+            
+            logger.debug("查找表调整完成，alpha=%s, beta=%s, gamma=%s", alpha, beta, gamma)
+            return result
+            
+        except Exception as e:
+            logger.error(f"查找表调整失败: {str(e)}")
+            return image
+    
+    def enhance_gray(self, image: np.ndarray, **kwargs) -> np.ndarray:
+        """
+        以灰度图输出的质量增强（例如供OCR使用）
+        
+        彩色图像在入口处转换一次灰度，之后各步骤都在单通道上执行，
+        不再进行任何色彩空间往返转换
+        
+        Args:
+            image: 输入图像
+            **kwargs: 增强参数，同 enhance_image
+            
+        Returns:
+            np.ndarray: 增强后的灰度图像
+        """
+        if len(image.shape) == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return self.enhance_image(image, **kwargs)
+    
+    def enhance_text_clarity(self, image: np.ndarray, grayscale: bool = False) -> np.ndarray:
         """
         专门针对文本的清晰度增强
         
         Args:
             image: 输入图像
+            grayscale: 是否输出灰度图（入口处转换一次灰度，省去 LAB 往返转换）
             
         Returns:
             np.ndarray: 增强后的图像
@@ -547,17 +697,23 @@ class ImageEnhancer:
         try:
             logger.info("开始文本清晰度增强")
             
-            # 1. 轻微降噪
-            denoised = self.bilateral_denoise(image, d=5, sigma_color=50, sigma_space=50)
+            if grayscale and len(image.shape) == 3:
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             
-            # 2. CLAHE增强对比度
-            contrast_enhanced = self.clahe_enhancement(denoised, clip_limit=3.0, tile_grid_size=(8, 8))
+            clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
             
-            # 3. 轻微锐化
-            sharpened = self.unsharp_mask_sharpen(contrast_enhanced, sigma=0.5, strength=1.2)
+            # 降噪、CLAHE 和锐化都只作用于亮度通道，只需一次 LAB 往返转换
+            result = self._enhance_in_lab(image, [
+                # 1. 轻微降噪
+                lambda l: cv2.bilateralFilter(l, 5, 50, 50),
+                # 2. CLAHE增强对比度
+                clahe.apply,
+                # 3. 轻微锐化
+                lambda l: self.unsharp_mask_sharpen(l, sigma=0.5, strength=1.2),
+            ])
             
             logger.info("文本清晰度增强完成")
-            return sharpened
+            return result
             
         except Exception as e:
             logger.error(f"文本清晰度增强失败: {str(e)}")
@@ -581,20 +737,33 @@ class ImageEnhancer:
             # 分析图像特征
             features = self._analyze_image_quality(image)
             
-            result = image.copy()
+            # 各增强步骤都返回新数组、不会原地修改输入，因此无需预先拷贝
+            result = image
             
             # 根据特征选择增强方法
-            if features['noise_level'] > 0.3:
-                logger.info("检测到较高噪声，应用降噪")
-                result = self.bilateral_denoise(result)
-            
             if features['contrast'] < 0.4:
+                # 需要 CLAHE 时本来就要转换到 LAB，降噪和锐化也一并在亮度通道上完成
+                steps = []
+                if features['noise_level'] > 0.3:
+                    logger.info("检测到较高噪声，应用降噪")
+                    steps.append(lambda l: cv2.bilateralFilter(l, 9, 75, 75))
+                
                 logger.info("检测到低对比度，应用CLAHE增强")
-                result = self.clahe_enhancement(result, clip_limit=2.5)
-            
-            if features['sharpness'] < 0.5:
-                logger.info("检测到模糊，应用锐化")
-                result = self.unsharp_mask_sharpen(result, strength=1.3)
+                steps.append(cv2.createCLAHE(clipLimit=2.5, tileGridSize=(8, 8)).apply)
+                
+                if features['sharpness'] < 0.5:
+                    logger.info("检测到模糊，应用锐化")
+                    steps.append(lambda l: self.unsharp_mask_sharpen(l, strength=1.3))
+                
+                result = self._enhance_in_lab(result, steps)
+            else:
+                if features['noise_level'] > 0.3:
+                    logger.info("检测到较高噪声，应用降噪")
+                    result = self.bilateral_denoise(result)
+                
+                if features['sharpness'] < 0.5:
+                    logger.info("检测到模糊，应用锐化")
+                    result = self.unsharp_mask_sharpen(result, strength=1.3)
             
             if features['brightness'] < 0.3:
                 logger.info("检测到偏暗，应用亮度调整")
@@ -610,6 +779,33 @@ class ImageEnhancer:
             logger.error(f"自动图像增强失败: {str(e)}")
             return image
     
+    def _enhance_in_lab(self, image: np.ndarray,
+                        steps: List[Callable[[np.ndarray], np.ndarray]]) -> np.ndarray:
+        """
+        在LAB色彩空间的L通道上依次执行多个增强步骤
+        
+        彩色图像只做一次 BGR→LAB 和一次 LAB→BGR 转换，
+        各步骤都在单通道上运行；灰度图像直接依次处理
+        
+        Args:
+            image: 输入图像
+            steps: 作用于单通道 uint8 图像的增强函数列表
+            
+        Returns:
+            np.ndarray: 增强后的图像
+        """
+        if len(image.shape) != 3:
+            for step in steps:
+                image = step(image)
+            return image
+        
+        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+        lightness = cv2.extractChannel(lab, 0)
+        for step in steps:
+            lightness = step(lightness)
+        cv2.insertChannel(lightness, lab, 0)
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+    
     def _analyze_image_quality(self, image: np.ndarray) -> Dict[str, float]:
         """
         分析图像质量特征
@@ -627,24 +823,33 @@ class ImageEnhancer:
             if len(image.shape) == 3:
                 gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             else:
-                gray = image.copy()
-            
-            # 1. 亮度分析
-            mean_brightness = np.mean(gray) / 255.0
+                gray = image
+            
+            # 这些特征只用于选择增强方法，在长边约 256 像素的缩略图上估计即可
+            height, width = gray.shape[:2]
+            scale = FEATURE_ANALYSIS_SIZE / max(height, width)
+            if scale < 1.0:
+                gray = cv2.resize(gray, (max(1, round(width * scale)), max(1, round(height * scale))),
+                                  interpolation=cv2.INTER_AREA)
+            
+            # 1. 亮度分析 / 2. 对比度分析：均值和标准差一次扫描得到
+            mean, std = cv2.meanStdDev(gray)
+            mean_brightness = mean[0, 0] / 255.0
             features['brightness'] = float(mean_brightness)
             
-            # 2. 对比度分析
-            std_dev = np.std(gray) / 128.0
+            std_dev = std[0, 0] / 128.0
             features['contrast'] = float(min(std_dev, 1.0))
             
-            # 3. 锐度分析（基于拉普拉斯方差）
-            laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-            sharpness = np.var(laplacian) / 10000.0
+            # 3. 锐度分析（基于拉普拉斯方差，uint8 输入的 3x3 拉普拉斯结果在 int16 范围内）
+            laplacian = cv2.Laplacian(gray, cv2.CV_16S)
+            sharpness = float(cv2.meanStdDev(laplacian)[1][0, 0]) ** 2 / 10000.0
             features['sharpness'] = float(min(sharpness, 1.0))
             
             # 4. 噪声水平估计
             blur = cv2.GaussianBlur(gray, (5, 5), 0)
-            noise = np.var(gray.astype(np.float32) - blur.astype(np.float32)) / 1000.0
+            # 有符号差值用 int16 保存，方差由 meanStdDev 一次扫描得到
+            diff = cv2.subtract(gray, blur, dtype=cv2.CV_16S)
+            noise = float(cv2.meanStdDev(diff)[1][0, 0]) ** 2 / 1000.0
             features['noise_level'] = float(min(noise, 1.0))
             
         except Exception as e:
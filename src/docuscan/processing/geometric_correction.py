@@ -7,6 +7,7 @@
 - 边框检测与裁剪 (Border Detection and Cropping)
 """
 
+import threading
 import cv2
 import numpy as np
 from typing import List, Tuple, Optional, Union
@@ -15,12 +16,37 @@ from .utils import ImageUtils
 
 logger = logging.getLogger(__name__)
 
+# 偏斜预检使用的缩略图长边
+SKEW_PROBE_SIZE = 256
+
+# 偏斜预检试探的旋转角度（度），覆盖投影剖面的搜索范围
+SKEW_PROBE_ANGLES = (-10.0, -7.0, -4.0, -2.0, -1.0, 1.0, 2.0, 4.0, 7.0, 10.0)
+
+# 各试探角度的投影方差均低于 0° 的该比例时，认为页面已经摆正
+SKEW_PROBE_RATIO = 0.8
+
+# 估计 Otsu 阈值所用缩略图的长边
+OTSU_ESTIMATE_SIZE = 512
+
+# 合并透视校正与去偏斜时，估计偏斜角度所用预览图的长边
+SKEW_PREVIEW_SIZE = 1024
+
 
 class GeometricCorrector:
     """几何校正器类"""
     
-    def __init__(self):
+    def __init__(self, use_cuda: bool = False):
+        """
+        Args:
+            use_cuda: 是否在 OpenCV 带 CUDA 且有可用设备时，将灰度化、模糊和霍夫边缘检测放到 GPU 上执行
+        """
         self.image_utils = ImageUtils()
+        self._workspace = threading.local()
+        
+        # 可选的 GPU 后端，任一 GPU 调用失败时回退到 CPU
+        self._use_cuda = use_cuda and self.image_utils.cuda_device_available()
+        if self._use_cuda:
+            logger.info("检测到CUDA设备，几何校正的边缘检测将使用GPU加速")
     
     def correct_document(self, image: np.ndarray, 
                         enable_perspective: bool = True,
@@ -36,18 +62,26 @@ class GeometricCorrector:
             enable_crop: 是否启用裁剪
             
         Returns:
-            np.ndarray: 校正后的图像
+            np.ndarray: 校正后的图像；各步骤都不需要变换时可能是输入图像本身或其视图
         """
-        result = image.copy()
+        # 各步骤都返回新数组（或裁剪视图），不修改输入，因此无需预先复制
+        result = image
         
+        # 在本次校正范围内按图像缓存灰度图和 Otsu 二值图，各步骤共用
+        self._workspace.gray_cache = {}
         try:
+            # 1-2. 透视校正和去偏斜都启用时合并为一次重采样
+            if enable_perspective and enable_deskew:
+                logger.info("开始透视校正与去偏斜...")
+                result = self._perspective_and_deskew(result)
+            
             # 1. 透视校正（如果启用）
-            if enable_perspective:
+            elif enable_perspective:
                 logger.info("开始透视校正...")
                 result = self.perspective_correction(result)
             
             # 2. 去偏斜（如果启用）
-            if enable_deskew:
+            elif enable_deskew:
                 logger.info("开始去偏斜...")
                 result = self.deskew(result)
             
@@ -62,6 +96,71 @@ class GeometricCorrector:
         except Exception as e:
             logger.error(f"几何校正失败: {str(e)}")
             return image
+        finally:
+            self._workspace.gray_cache = None
+    
+    def _get_buffer(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """
+        获取当前线程的可复用缓冲区
+        
+        每个名称只保留最近一次的尺寸，尺寸或类型变化时重新分配
+        
+        Args:
+            name: 缓冲区名称
+            shape: 数组形状
+            dtype: 数据类型
+            
+        Returns:
+            np.ndarray: 缓冲区数组
+        """
+        buffers = getattr(self._workspace, "buffers", None)
+        if buffers is None:
+            buffers = self._workspace.buffers = {}
+        
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = buffers[name] = np.empty(shape, dtype=dtype)
+        return buffer
+    
+    def _gray_and_otsu(self, image: np.ndarray,
+                       otsu: bool = True) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        获取灰度图和反相 Otsu 二值图（内容为白色），在 correct_document 调用范围内按图像复用
+        
+        Args:
+            image: 输入图像
+            otsu: 是否需要 Otsu 二值图
+            
+        Returns:
+            Tuple[np.ndarray, Optional[np.ndarray]]: (灰度图, 二值图)，otsu 为 False 时二值图可能为 None
+        """
+        cache = getattr(self._workspace, "gray_cache", None)
+        key = (image.ctypes.data, image.shape, image.dtype.str)
+        entry = cache.get(key) if cache is not None else None
+        
+        # 缓存项持有原图引用，保证地址不会被其他数组复用
+        if entry is None or entry[0] is not image:
+            if len(image.shape) == 3:
+                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            else:
+                gray = image
+            entry = [image, gray, None]
+            if cache is not None:
+                cache[key] = entry
+        
+        if otsu and entry[2] is None:
+            # Otsu 阈值只依赖灰度直方图，在长边不超过512像素的最近邻抽样图上估计即可，
+            # 整幅图像只做一次简单阈值比较
+            gray = entry[1]
+            scale = OTSU_ESTIMATE_SIZE / max(gray.shape)
+            if scale < 1:
+                small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST)
+                level, _ = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+                _, entry[2] = cv2.threshold(gray, level, 255, cv2.THRESH_BINARY_INV)
+            else:
+                _, entry[2] = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        
+        return entry[1], entry[2]
     
     def find_document_contour(self, image: np.ndarray) -> Optional[np.ndarray]:
         """
@@ -73,25 +172,39 @@ class GeometricCorrector:
         Returns:
             Optional[np.ndarray]: 文档轮廓，如果未找到则返回None
         """
-        # 转换为灰度图
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
+        blurred = None
+        if self._use_cuda:
+            try:
+                # 灰度化和高斯模糊在 GPU 上完成，只下载模糊结果
+                gpu_gray = self._upload_gray(image)
+                gaussian = cv2.cuda.createGaussianFilter(cv2.CV_8UC1, cv2.CV_8UC1, (5, 5), 0)
+                blurred = gaussian.apply(gpu_gray).download()
+            except cv2.error as e:
+                logger.warning(f"GPU高斯模糊失败，回退到CPU: {str(e)}")
+        
+        if blurred is None:
+            # 转换为灰度图
+            gray, _ = self._gray_and_otsu(image, otsu=False)
+            
+            # 高斯模糊降噪
+            blurred = cv2.GaussianBlur(gray, (5, 5), 0,
+                                       dst=self._get_buffer("contour_blurred", gray.shape))
         
-        # 高斯模糊降噪
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        # 中间结果写入按尺寸复用的缓冲区
+        shape = blurred.shape
         
         # 自适应阈值化
         thresh = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                     cv2.THRESH_BINARY, 11, 2)
+                                     cv2.THRESH_BINARY, 11, 2,
+                                     dst=self._get_buffer("contour_thresh", shape))
         
         # 形态学操作，连接文本区域
         kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-        morph = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+        morph = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel,
+                                 dst=self._get_buffer("contour_morph", shape))
         
         # 边缘检测
-        edges = cv2.Canny(morph, 75, 200)
+        edges = cv2.Canny(morph, 75, 200, edges=self._get_buffer("contour_edges", shape))
         
         # 查找轮廓
         contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -131,38 +244,13 @@ class GeometricCorrector:
         Returns:
             np.ndarray: 透视校正后的图像
         """
-        # 查找文档轮廓
-        document_contour = self.find_document_contour(image)
-        
-        if document_contour is None:
-            logger.warning("未找到文档轮廓，跳过透视校正")
-            return image
-        
         try:
-            # 排序轮廓点
-            ordered_points = self.image_utils.order_rectangle_points(document_contour)
-            
-            # 计算目标矩形的尺寸
-            width_top = np.linalg.norm(ordered_points[1] - ordered_points[0])
-            width_bottom = np.linalg.norm(ordered_points[2] - ordered_points[3])
-            max_width = max(int(width_top), int(width_bottom))
-            
-            height_left = np.linalg.norm(ordered_points[3] - ordered_points[0])
-            height_right = np.linalg.norm(ordered_points[2] - ordered_points[1])
-            max_height = max(int(height_left), int(height_right))
-            
-            # 定义目标点
-            dst_points = np.array([
-                [0, 0],
-                [max_width - 1, 0],
-                [max_width - 1, max_height - 1],
-                [0, max_height - 1]
-            ], dtype=np.float32)
-            
-            # 计算透视变换矩阵
-            transform_matrix = cv2.getPerspectiveTransform(ordered_points, dst_points)
+            transform = self._perspective_transform(image)
+            if transform is None:
+                return image
             
             # 应用透视变换
+            transform_matrix, (max_width, max_height) = transform
             corrected = cv2.warpPerspective(image, transform_matrix, (max_width, max_height))
             
             logger.info(f"透视校正完成，输出尺寸: {max_width}x{max_height}")
@@ -172,6 +260,100 @@ class GeometricCorrector:
             logger.error(f"透视校正失败: {str(e)}")
             return image
     
+    def _perspective_transform(self, image: np.ndarray) -> Optional[Tuple[np.ndarray, Tuple[int, int]]]:
+        """
+        计算把文档四边形映射为正视矩形的透视变换
+        
+        Args:
+            image: 输入图像
+            
+        Returns:
+            Optional[Tuple[np.ndarray, Tuple[int, int]]]: (3x3 变换矩阵, (输出宽度, 输出高度))，未找到文档轮廓时返回 None
+        """
+        # 查找文档轮廓
+        document_contour = self.find_document_contour(image)
+        
+        if document_contour is None:
+            logger.warning("未找到文档轮廓，跳过透视校正")
+            return None
+        
+        # 排序轮廓点
+        ordered_points = self.image_utils.order_rectangle_points(document_contour)
+        
+        # 计算目标矩形的尺寸
+        width_top = np.linalg.norm(ordered_points[1] - ordered_points[0])
+        width_bottom = np.linalg.norm(ordered_points[2] - ordered_points[3])
+        max_width = max(int(width_top), int(width_bottom))
+        
+        height_left = np.linalg.norm(ordered_points[3] - ordered_points[0])
+        height_right = np.linalg.norm(ordered_points[2] - ordered_points[1])
+        max_height = max(int(height_left), int(height_right))
+        
+        # 定义目标点
+        dst_points = np.array([
+            [0, 0],
+            [max_width - 1, 0],
+            [max_width - 1, max_height - 1],
+            [0, max_height - 1]
+        ], dtype=np.float32)
+        
+        # 计算透视变换矩阵
+        transform_matrix = cv2.getPerspectiveTransform(ordered_points, dst_points)
+        return transform_matrix, (max_width, max_height)
+    
+    def _perspective_and_deskew(self, image: np.ndarray) -> np.ndarray:
+        """
+        透视校正与去偏斜合并为一次 warpPerspective
+        
+        偏斜角度在缩小的透视校正预览图上估计，再把旋转矩阵与透视矩阵相乘，
+        整幅图像只重采样一次。
+        
+        Args:
+            image: 输入图像
+            
+        Returns:
+            np.ndarray: 校正后的图像
+        """
+        try:
+            transform = self._perspective_transform(image)
+        except Exception as e:
+            logger.error(f"透视校正失败: {str(e)}")
+            transform = None
+        
+        if transform is None:
+            return self.deskew(image)
+        
+        transform_matrix, (width, height) = transform
+        
+        # 在缩小的预览图上估计偏斜角度
+        scale = min(1.0, SKEW_PREVIEW_SIZE / max(width, height))
+        preview_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        scale_matrix = np.diag([scale, scale, 1.0])
+        preview = cv2.warpPerspective(image, scale_matrix @ transform_matrix, preview_size)
+        skew_angle = self._calculate_skew_angle_advanced(preview)
+        
+        if abs(skew_angle) < 0.5:  # 角度太小，不需要校正
+            logger.info(f"偏斜角度很小({skew_angle:.2f}°)，只做透视校正")
+            return cv2.warpPerspective(image, transform_matrix, (width, height))
+        
+        # 合成旋转与透视变换
+        rotation_matrix, (new_width, new_height) = self.image_utils.expanded_rotation_matrix(
+            width, height, -skew_angle)
+        combined = np.vstack([rotation_matrix, [0.0, 0.0, 1.0]]) @ transform_matrix
+        border_value = (255,) * image.shape[2] if image.ndim == 3 else 255
+        corrected = cv2.warpPerspective(image, combined, (new_width, new_height),
+                                        flags=cv2.INTER_LINEAR)
+        
+        # 旋转后露出的画布角落填充为白色（合成变换会把这些位置映射到文档外的原图像素）
+        page_corners = np.array([[[0, 0]], [[width, 0]], [[width, height]], [[0, height]]], dtype=np.float64)
+        page_polygon = cv2.transform(page_corners, rotation_matrix)
+        outside = np.full((new_height, new_width), 255, dtype=np.uint8)
+        cv2.fillConvexPoly(outside, np.round(page_polygon).astype(np.int32), 0)
+        corrected[outside > 0] = border_value
+        
+        logger.info(f"透视校正与去偏斜完成，旋转角度: {-skew_angle:.2f}°，输出尺寸: {new_width}x{new_height}")
+        return corrected
+    
     def deskew(self, image: np.ndarray) -> np.ndarray:
         """
         去偏斜
@@ -210,37 +392,42 @@ class GeometricCorrector:
         Returns:
             float: 偏斜角度（度）
         """
-        # 转换为灰度图
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image.copy()
-        
-        angles = []
+        gray = None
+        gpu_gray = None
+        if self._use_cuda:
+            try:
+                # 只上传一次，灰度图留在 GPU 上供霍夫检测使用
+                gpu_gray = self._upload_gray(image)
+                gray = gpu_gray.download()
+            except cv2.error as e:
+                logger.warning(f"GPU灰度转换失败，回退到CPU: {str(e)}")
+                gpu_gray = None
+        
+        if gray is None:
+            # 转换为灰度图
+            gray, _ = self._gray_and_otsu(image, otsu=False)
         
-        # 方法1: 基于霍夫直线检测
-        try:
-            angle1 = self._hough_line_skew_detection(gray)
-            if angle1 is not None:
-                angles.append(angle1)
-        except:
-            pass
+        # 快速预检：已经摆正的页面直接返回，跳过三种检测方法
+        is_straight, direction = self._skew_probe(gray)
+        if is_straight:
+            return 0.0
         
-        # 方法2: 基于投影剖面
-        try:
-            angle2 = self._projection_profile_skew_detection(gray)
-            if angle2 is not None:
-                angles.append(angle2)
-        except:
-            pass
+        # 方法1: 基于霍夫直线检测；方法2: 基于投影剖面；方法3: 基于文本行检测
+        # 三种方法相互独立，且耗时都在释放 GIL 的 OpenCV 调用中，在共享线程池中并行执行
+        futures = [
+            self.image_utils.submit_task(self._hough_line_skew_detection, gray, gpu_gray),
+            self.image_utils.submit_task(self._projection_profile_skew_detection, gray, direction),
+            self.image_utils.submit_task(self._text_line_skew_detection, gray),
+        ]
         
-        # 方法3: 基于文本行检测
-        try:
-            angle3 = self._text_line_skew_detection(gray)
-            if angle3 is not None:
-                angles.append(angle3)
-        except:
-            pass
+        angles = []
+        for future in futures:
+            try:
+                angle = future.result()
+                if angle is not None:
+                    angles.append(angle)
+            except Exception:
+                pass
         
         if not angles:
             return 0.0
@@ -248,57 +435,158 @@ class GeometricCorrector:
         # 返回角度的中位数
         return float(np.median(angles))
     
-    def _hough_line_skew_detection(self, gray: np.ndarray) -> Optional[float]:
-        """基于霍夫直线的偏斜检测"""
-        # 边缘检测
-        edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+    def _skew_probe(self, gray: np.ndarray) -> Tuple[bool, int]:
+        """
+        在缩略图上比较 0° 与若干试探角度的水平投影方差，快速判断页面是否已摆正
+        
+        Args:
+            gray: 灰度图像
+            
+        Returns:
+            Tuple[bool, int]: (是否可视为无偏斜, 投影方差增大的旋转方向 -1/0/1)
+        """
+        scale = SKEW_PROBE_SIZE / max(gray.shape)
+        if scale < 1:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
         
-        # 霍夫直线检测
-        lines = cv2.HoughLines(edges, 1, np.pi/180, threshold=100)
+        # 去掉四周 10% 的边缘：页面边框或扫描黑边是整行的"墨迹"，会在 0° 处制造虚假的方差峰
+        margin_y, margin_x = gray.shape[0] // 10, gray.shape[1] // 10
+        gray = gray[margin_y:gray.shape[0] - margin_y, margin_x:gray.shape[1] - margin_x]
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        
+        height, width = binary.shape
+        center = (width // 2, height // 2)
+        rotated = np.empty_like(binary)
+        
+        def projection_variance(angle: float) -> float:
+            if angle:
+                rotation_matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
+                cv2.warpAffine(binary, rotation_matrix, (width, height), dst=rotated)
+                source = rotated
+            else:
+                source = binary
+            projection = cv2.reduce(source, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S)
+            return float(cv2.meanStdDev(projection)[1][0, 0] ** 2)
+        
+        v0 = projection_variance(0.0)
+        variances = [projection_variance(angle) for angle in SKEW_PROBE_ANGLES]
+        
+        # 摆正的文本页在 0° 处有明显的方差峰；只看 ±1° 不够，0° 附近可能只是局部峰值，
+        # 真正的峰在更大的角度上，因此需要所有试探角度都明显低于 0°
+        best = int(np.argmax(variances))
+        is_straight = v0 > 0 and variances[best] < v0 * SKEW_PROBE_RATIO
+        return is_straight, int(np.sign(SKEW_PROBE_ANGLES[best]))
+    
+    def _upload_gray(self, image: np.ndarray) -> "cv2.cuda.GpuMat":
+        """上传图像到 GPU 并转换为灰度图"""
+        gpu_image = cv2.cuda_GpuMat()
+        gpu_image.upload(image)
+        if len(image.shape) == 3:
+            return cv2.cuda.cvtColor(gpu_image, cv2.COLOR_BGR2GRAY)
+        return gpu_image
+    
+    def _hough_line_skew_detection(self, gray: np.ndarray,
+                                   gpu_gray: Optional["cv2.cuda.GpuMat"] = None) -> Optional[float]:
+        """基于概率霍夫直线的偏斜检测，提供 gpu_gray 时在 GPU 上完成边缘和线段检测"""
+        # 角度与尺度无关，在半分辨率上做边缘检测
+        height, width = gray.shape[:2]
+        small_size = (max(1, width // 2), max(1, height // 2))
+        min_line_length = max(50, small_size[0] // 20)
+        
+        lines = None
+        detected = False
+        if gpu_gray is not None:
+            try:
+                # 缩放、边缘和线段检测都在 GPU 上完成，只下载线段端点
+                small = cv2.cuda.resize(gpu_gray, small_size, interpolation=cv2.INTER_AREA)
+                edges = cv2.cuda.createCannyEdgeDetector(50, 150).detect(small)
+                detector = cv2.cuda.createHoughSegmentDetector(1, np.pi/180, min_line_length, 10)
+                segments = detector.detect(edges)
+                lines = None if segments.empty() else segments.download()
+                detected = True
+            except cv2.error as e:
+                logger.warning(f"GPU霍夫检测失败，回退到CPU: {str(e)}")
+        
+        if not detected:
+            small = cv2.resize(gray, small_size, interpolation=cv2.INTER_AREA)
+            edges = cv2.Canny(small, 50, 150, apertureSize=3)
+            
+            # 概率霍夫直线检测，直接得到线段端点
+            lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=100,
+                                    minLineLength=min_line_length,
+                                    maxLineGap=10)
         
         if lines is None or len(lines) < 5:
             return None
         
-        angles = []
-        for line in lines:
-            rho, theta = line[0]
-            angle = theta * 180 / np.pi - 90
-            
-            # 只考虑接近水平的线
-            if abs(angle) < 30:
-                angles.append(angle)
+        segments = lines.reshape(-1, 4).astype(np.float64)
+        angles = np.degrees(np.arctan2(segments[:, 3] - segments[:, 1],
+                                       segments[:, 2] - segments[:, 0]))
+        
+        # 只考虑接近水平的线
+        angles = angles[np.abs(angles) < 30]
         
-        if len(angles) < 3:
+        if angles.size < 3:
             return None
         
         return float(np.median(angles))
     
-    def _projection_profile_skew_detection(self, gray: np.ndarray) -> Optional[float]:
-        """基于投影剖面的偏斜检测"""
-        angles_to_test = np.arange(-10, 11, 0.5)
-        variances = []
-        
-        height, width = gray.shape
-        center = (width // 2, height // 2)
+    def _projection_profile_skew_detection(self, gray: np.ndarray,
+                                           direction: int = 0) -> Optional[float]:
+        """
+        基于投影剖面的偏斜检测（先粗后精的角度搜索）
         
-        for angle in angles_to_test:
-            # 旋转图像
-            rotation_matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
-            rotated = cv2.warpAffine(gray, rotation_matrix, (width, height))
+        Args:
+            gray: 灰度图像
+            direction: 预检得到的偏斜方向，非0时粗搜索只覆盖该侧
             
-            # 计算水平投影
-            projection = np.sum(rotated, axis=1)
+        Returns:
+            Optional[float]: 偏斜角度（度）
+        """
+        # 缩小到长边不超过512像素，旋转的像素量随缩放比例平方下降
+        scale = 512 / max(gray.shape)
+        if scale < 1:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        # Otsu二值化（文字为前景），使投影直接反映墨迹密度
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        
+        height, width = binary.shape
+        center = (width // 2, height // 2)
+        rotated = np.empty_like(binary)
+        
+        def best_angle(angles: np.ndarray) -> float:
+            # 整批预先构造旋转矩阵
+            matrices = np.empty((len(angles), 2, 3), dtype=np.float64)
+            for k, angle in enumerate(angles):
+                matrices[k] = cv2.getRotationMatrix2D(center, float(angle), 1.0)
+            
+            variances = np.empty(len(angles), dtype=np.float64)
+            for k, rotation_matrix in enumerate(matrices):
+                # 旋转二值图，复用输出缓冲区；投影方差对插值精度不敏感，使用最近邻插值
+                cv2.warpAffine(binary, rotation_matrix, (width, height), dst=rotated,
+                               flags=cv2.INTER_NEAREST)
+                
+                # 计算水平投影的方差，meanStdDev 一次遍历同时累加和与平方和
+                projection = cv2.reduce(rotated, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S)
+                variances[k] = cv2.meanStdDev(projection)[1][0, 0] ** 2
             
-            # 计算投影的方差
-            variance = np.var(projection)
-            variances.append(variance)
+            return angles[np.argmax(variances)]
         
-        if not variances:
-            return None
+        # 粗搜索：2°步长
+        if direction > 0:
+            coarse_angles = np.arange(0, 10.01, 2.0)
+        elif direction < 0:
+            coarse_angles = np.arange(-10, 0.01, 2.0)
+        else:
+            coarse_angles = np.arange(-10, 10.01, 2.0)
+        best = best_angle(coarse_angles)
+        
+        # 细搜索：在最佳角度附近以0.1°步长搜索
+        best = best_angle(np.arange(best - 2, best + 2.01, 0.1))
         
         # 找到方差最大的角度（文本行最清晰）
-        best_angle_index = np.argmax(variances)
-        return float(angles_to_test[best_angle_index])
+        return float(round(best, 1))
     
     def _text_line_skew_detection(self, gray: np.ndarray) -> Optional[float]:
         """基于文本行的偏斜检测"""
@@ -312,24 +600,16 @@ class GeometricCorrector:
         if len(contours) < 3:
             return None
         
-        # 计算每个轮廓的最小外接矩形
-        angles = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > 500:  # 过滤小的轮廓
-                rect = cv2.minAreaRect(contour)
-                angle = rect[2]
-                
-                # 调整角度到 -45 到 45 度范围
-                if angle < -45:
-                    angle += 90
-                elif angle > 45:
-                    angle -= 90
-                
-                if abs(angle) < 30:  # 只考虑接近水平的角度
-                    angles.append(angle)
+        # 先按面积过滤小的轮廓，只对保留下来的轮廓计算最小外接矩形
+        areas = np.fromiter((cv2.contourArea(c) for c in contours), dtype=np.float64, count=len(contours))
+        keep = np.flatnonzero(areas > 500)
+        angles = np.array([cv2.minAreaRect(contours[i])[2] for i in keep], dtype=np.float64)
         
-        if len(angles) < 3:
+        # 调整角度到 -45 到 45 度范围，只考虑接近水平的角度
+        angles = (angles + 45.0) % 90.0 - 45.0
+        angles = angles[np.abs(angles) < 30]
+        
+        if angles.size < 3:
             return None
         
         return float(np.median(angles))
@@ -346,28 +626,16 @@ class GeometricCorrector:
             np.ndarray: 裁剪后的图像
         """
         try:
-            # 转换为灰度图
-            if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = image.copy()
-            
-            # 二值化
-            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            
-            # 反转二值图像（背景为黑色，前景为白色）
-            binary_inv = cv2.bitwise_not(binary)
+            # 灰度化并用 Otsu 反相二值化（背景为黑色，前景为白色）
+            _, binary_inv = self._gray_and_otsu(image)
             
-            # 查找非零像素的边界
-            coords = cv2.findNonZero(binary_inv)
+            # 直接在二值图上获取非零像素的边界框，不需要展开为坐标数组
+            x, y, w, h = cv2.boundingRect(binary_inv)
             
-            if coords is None:
+            if w == 0 or h == 0:
                 logger.warning("未找到文档内容，跳过裁剪")
                 return image
             
-            # 获取边界框
-            x, y, w, h = cv2.boundingRect(coords)
-            
             # 添加边距
             x = max(0, x - margin)
             y = max(0, y - margin)
@@ -384,6 +652,36 @@ class GeometricCorrector:
             logger.error(f"文档裁剪失败: {str(e)}")
             return image
     
+    def find_content_bounds(self, image: np.ndarray,
+                            threshold: int = 240) -> Optional[Tuple[int, int, int, int]]:
+        """
+        查找非白色内容的外接矩形
+        
+        Args:
+            image: 输入图像
+            threshold: 白色阈值
+            
+        Returns:
+            Optional[Tuple[int, int, int, int]]: (x, y, 宽, 高)，没有非白色像素时返回 None
+        """
+        # 转换为灰度图
+        gray, _ = self._gray_and_otsu(image, otsu=False)
+        
+        # 找到非白色区域
+        mask = cv2.compare(gray, threshold, cv2.CMP_LT)
+        
+        # 按列、按行归约为一维，只需在两个一维数组中查找首尾非零位置
+        xs = np.flatnonzero(cv2.reduce(mask, 0, cv2.REDUCE_MAX))
+        ys = np.flatnonzero(cv2.reduce(mask, 1, cv2.REDUCE_MAX))
+        
+        if xs.size == 0:
+            return None
+        
+        # 获取边界
+        x_min, x_max = xs[0], xs[-1]
+        y_min, y_max = ys[0], ys[-1]
+        return int(x_min), int(y_min), int(x_max - x_min + 1), int(y_max - y_min + 1)
+    
     def auto_crop_white_borders(self, image: np.ndarray, threshold: int = 240) -> np.ndarray:
         """
         自动裁剪白色边框
@@ -396,27 +694,13 @@ class GeometricCorrector:
             np.ndarray: 裁剪后的图像
         """
         try:
-            # 转换为灰度图
-            if len(image.shape) == 3:
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = image.copy()
-            
-            # 找到非白色区域
-            mask = gray < threshold
-            
-            # 找到非零像素的坐标
-            coords = np.column_stack(np.where(mask))
-            
-            if len(coords) == 0:
+            bounds = self.find_content_bounds(image, threshold)
+            if bounds is None:
                 return image
             
-            # 获取边界
-            y_min, x_min = coords.min(axis=0)
-            y_max, x_max = coords.max(axis=0)
-            
             # 裁剪图像
-            cropped = image[y_min:y_max+1, x_min:x_max+1]
+            x, y, width, height = bounds
+            cropped = image[y:y + height, x:x + width]
             
             logger.info(f"白色边框裁剪完成，从 {image.shape} 裁剪到 {cropped.shape}")
             return cropped
@@ -10,16 +10,130 @@
 
 import cv2
 import numpy as np
-from typing import List, Tuple, Optional, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple, Optional, Union
 import math
 import logging
+import os
+import threading
 
 logger = logging.getLogger(__name__)
 
+# 标记当前线程是否为共享线程池的工作线程
+_task_thread = threading.local()
+
+
+def _mark_task_thread() -> None:
+    """共享线程池工作线程的初始化函数"""
+    _task_thread.active = True
+
+
+# 正在执行的批量处理数，以及第一个批量开始前 OpenCV 的线程数（全部结束后恢复）
+_batch_lock = threading.Lock()
+_batch_depth = 0
+_batch_saved_threads = 0
+
+
+# 各处理模块内部并行（逐通道处理、组合阈值化、偏斜检测）共用的线程池，
+# 按 CPU 核心数定长，整个进程只有一个，不再为每个处理器实例各建一个
+_task_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                thread_name_prefix="docuscan-task",
+                                initializer=_mark_task_thread)
+
 
 class ImageUtils:
     """图像处理工具类"""
     
+    # PIL 图像模式到 OpenCV BGR 的颜色转换代码
+    _PIL_TO_BGR = {
+        'RGB': cv2.COLOR_RGB2BGR,
+        'RGBA': cv2.COLOR_RGBA2BGR,
+        'L': cv2.COLOR_GRAY2BGR,
+    }
+    
+    # restore_size 的放大质量到插值方式的映射
+    _RESTORE_INTERPOLATION = {
+        'linear': cv2.INTER_LINEAR,
+        'cubic': cv2.INTER_CUBIC,
+        'lanczos': cv2.INTER_LANCZOS4,
+    }
+    
+    @staticmethod
+    def cuda_device_available() -> bool:
+        """
+        检查当前 OpenCV 是否带 CUDA 模块且存在可用设备
+        
+        Returns:
+            bool: 可以使用 cv2.cuda 时返回 True
+        """
+        try:
+            return cv2.cuda.getCudaEnabledDeviceCount() > 0
+        except (AttributeError, cv2.error):
+            # 未编译 CUDA 支持的 OpenCV 没有 cv2.cuda 模块，或驱动不可用
+            return False
+    
+    @staticmethod
+    def submit_task(func: Callable[..., Any], *args) -> Future:
+        """
+        将处理步骤提交到进程内共享的线程池
+        
+        以下情况直接在当前线程执行并返回已完成的 Future，避免线程过度订阅：
+        已经在共享线程池中（嵌套提交）、OpenCV 被配置为单线程
+        （批量处理的工作进程、多 worker 部署或单核机器）
+        
+        Args:
+            func: 处理函数
+            *args: 处理函数的参数
+            
+        Returns:
+            Future: 处理结果，异常同样通过 future.result() 抛出
+        """
+        if getattr(_task_thread, "active", False) or cv2.getNumThreads() <= 1:
+            future = Future()
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return _task_pool.submit(func, *args)
+    
+    @staticmethod
+    def map_batch(func: Callable[[np.ndarray], Any], images: List[np.ndarray],
+                  max_workers: Optional[int] = None) -> List[Any]:
+        """
+        在线程池中并行处理多页图像（OpenCV 内核会释放GIL）
+        
+        页级并行已占满CPU核心，批量期间把 OpenCV 内部线程数固定为 1，
+        各页内部的 submit_task 也随之在当前线程执行，避免 页数 × 线程数 的过度订阅；
+        OpenCV 线程数是进程级设置，最后一个批量结束后恢复原值
+        
+        Args:
+            func: 单页处理函数
+            images: 输入图像列表
+            max_workers: 最大线程数，默认使用CPU核数
+            
+        Returns:
+            List[Any]: 与输入顺序一致的处理结果
+        """
+        global _batch_depth, _batch_saved_threads
+        if len(images) <= 1:
+            return [func(image) for image in images]
+        
+        workers = min(max_workers or os.cpu_count() or 1, len(images))
+        with _batch_lock:
+            if _batch_depth == 0:
+                _batch_saved_threads = cv2.getNumThreads()
+                cv2.setNumThreads(1)
+            _batch_depth += 1
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(func, images))
+        finally:
+            with _batch_lock:
+                _batch_depth -= 1
+                if _batch_depth == 0:
+                    cv2.setNumThreads(_batch_saved_threads)
+    
     @staticmethod
     def pil_to_cv2(pil_image) -> np.ndarray:
         """
@@ -31,12 +145,15 @@ class ImageUtils:
         Returns:
             np.ndarray: OpenCV格式的图像数组
         """
-        # 转换为RGB（如果不是的话）
-        if pil_image.mode != 'RGB':
+        # 常见模式直接由 cvtColor 转换，避免 PIL convert 额外生成一份RGB副本
+        conversion = ImageUtils._PIL_TO_BGR.get(pil_image.mode)
+        if conversion is None:
             pil_image = pil_image.convert('RGB')
+            conversion = cv2.COLOR_RGB2BGR
         
         # PIL使用RGB，OpenCV使用BGR
-        cv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+        # np.asarray 直接包装PIL缓冲区，由 cvtColor 一次性生成BGR副本
+        cv_image = cv2.cvtColor(np.asarray(pil_image), conversion)
         return cv_image
     
     @staticmethod
@@ -61,7 +178,28 @@ class ImageUtils:
         return Image.fromarray(rgb_image)
     
     @staticmethod
-    def resize_image(image: np.ndarray, max_width: int = 1500, max_height: int = 1500) -> Tuple[np.ndarray, float]:
+    def fit_size(width: int, height: int,
+                 max_width: int = 1500, max_height: int = 1500) -> Tuple[int, int, float]:
+        """
+        计算缩小到最大尺寸以内后的图像尺寸
+        
+        Args:
+            width: 原始宽度
+            height: 原始高度
+            max_width: 最大宽度
+            max_height: 最大高度
+            
+        Returns:
+            Tuple[int, int, float]: (新宽度, 新高度, 缩放比例)，不放大图像
+        """
+        scale = min(max_width / width, max_height / height, 1.0)
+        if scale < 1.0:
+            return int(width * scale), int(height * scale), scale
+        return width, height, 1.0
+    
+    @staticmethod
+    def resize_image(image: np.ndarray, max_width: int = 1500, max_height: int = 1500,
+                     dst: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float]:
         """
         调整图像大小以适应处理需求
         
@@ -69,27 +207,28 @@ class ImageUtils:
             image: 输入图像
             max_width: 最大宽度
             max_height: 最大高度
+            dst: 可选的预分配输出数组，形状与类型匹配时直接写入
             
         Returns:
             Tuple[np.ndarray, float]: (调整后的图像, 缩放比例)
         """
         height, width = image.shape[:2]
-        
-        # 计算缩放比例
-        scale_width = max_width / width
-        scale_height = max_height / height
-        scale = min(scale_width, scale_height, 1.0)  # 不放大图像
+        new_width, new_height, scale = ImageUtils.fit_size(width, height, max_width, max_height)
         
         if scale < 1.0:
-            new_width = int(width * scale)
-            new_height = int(height * scale)
+            # 缩小使用 INTER_AREA，速度和质量都优于线性插值
+            if dst is not None and dst.shape == (new_height, new_width) + image.shape[2:] \
+                    and dst.dtype == image.dtype:
+                cv2.resize(image, (new_width, new_height), dst=dst, interpolation=cv2.INTER_AREA)
+                return dst, scale
             resized = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
             return resized, scale
         
         return image, 1.0
     
     @staticmethod
-    def restore_size(image: np.ndarray, original_size: Tuple[int, int], scale: float) -> np.ndarray:
+    def restore_size(image: np.ndarray, original_size: Tuple[int, int], scale: float,
+                     quality: str = 'linear') -> np.ndarray:
         """
         将图像恢复到原始大小
         
@@ -97,13 +236,18 @@ class ImageUtils:
             image: 处理后的图像
             original_size: 原始尺寸 (width, height)
             scale: 之前的缩放比例
+            quality: 放大质量，'linear'（默认，最快）、'cubic' 或 'lanczos'
             
         Returns:
             np.ndarray: 恢复尺寸后的图像
         """
-        if scale != 1.0:
-            return cv2.resize(image, original_size, interpolation=cv2.INTER_CUBIC)
-        return image
+        if scale == 1.0 or image.shape[1::-1] == tuple(original_size):
+            return image
+        
+        interpolation = ImageUtils._RESTORE_INTERPOLATION.get(quality)
+        if interpolation is None:
+            raise ValueError(f"不支持的放大质量: {quality}")
+        return cv2.resize(image, original_size, interpolation=interpolation)
     
     @staticmethod
     def get_contour_area(contour: np.ndarray) -> float:
@@ -168,25 +312,17 @@ class ImageUtils:
             raise ValueError("必须提供4个点")
         
         # 重塑为 (4, 2) 形状
-        points = points.reshape(4, 2)
-        
-        # 计算中心点
-        center_x = np.mean(points[:, 0])
-        center_y = np.mean(points[:, 1])
-        
-        # 根据相对于中心点的位置对点进行分类
-        ordered_points = np.zeros((4, 2), dtype=np.float32)
-        
-        for point in points:
-            x, y = point
-            if x < center_x and y < center_y:  # 左上
-                ordered_points[0] = point
-            elif x >= center_x and y < center_y:  # 右上
-                ordered_points[1] = point
-            elif x >= center_x and y >= center_y:  # 右下
-                ordered_points[2] = point
-            else:  # 左下
-                ordered_points[3] = point
+        pts = points.reshape(4, 2).astype(np.float32)
+        
+        # 左上角 x+y 最小，右下角最大；右上角 y-x 最小，左下角最大
+        s = pts.sum(axis=1)
+        d = np.diff(pts, axis=1).ravel()
+        
+        ordered_points = np.empty((4, 2), dtype=np.float32)
+        ordered_points[0] = pts[np.argmin(s)]
+        ordered_points[1] = pts[np.argmin(d)]
+        ordered_points[2] = pts[np.argmax(s)]
+        ordered_points[3] = pts[np.argmax(d)]
         
         return ordered_points
     
@@ -218,7 +354,31 @@ class ImageUtils:
             np.ndarray: 旋转后的图像
         """
         height, width = image.shape[:2]
+        rotation_matrix, (new_width, new_height) = ImageUtils.expanded_rotation_matrix(
+            width, height, angle, center)
+        
+        # 执行旋转
+        rotated = cv2.warpAffine(image, rotation_matrix, (new_width, new_height), 
+                                flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, 
+                                borderValue=(255, 255, 255))
         
+        return rotated
+    
+    @staticmethod
+    def expanded_rotation_matrix(width: int, height: int, angle: float,
+                                 center: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        计算旋转矩阵，并平移到能容纳整幅旋转结果的新画布上
+        
+        Args:
+            width: 图像宽度
+            height: 图像高度
+            angle: 旋转角度（度）
+            center: 旋转中心，默认为图像中心
+            
+        Returns:
+            Tuple[np.ndarray, Tuple[int, int]]: (2x3 旋转矩阵, (新宽度, 新高度))
+        """
         if center is None:
             center = (width // 2, height // 2)
         
@@ -235,12 +395,7 @@ class ImageUtils:
         rotation_matrix[0, 2] += (new_width / 2) - center[0]
         rotation_matrix[1, 2] += (new_height / 2) - center[1]
         
-        # 执行旋转
-        rotated = cv2.warpAffine(image, rotation_matrix, (new_width, new_height), 
-                                flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, 
-                                borderValue=(255, 255, 255))
-        
-        return rotated
+        return rotation_matrix, (new_width, new_height)
     
     @staticmethod
     def create_white_background(width: int, height: int, channels: int = 3) -> np.ndarray:
@@ -274,14 +429,63 @@ class ImageUtils:
             np.ndarray: 除法结果
         """
         # 创建结果数组
-        result = np.full_like(numerator, default_value, dtype=np.float32)
+        result = np.full(numerator.shape, default_value, dtype=np.float32)
         
-        # 只在分母不为0的地方进行除法
-        mask = denominator != 0
-        result[mask] = numerator[mask] / denominator[mask]
+        # 只在分母不为0的地方进行除法，直接写入结果数组
+        np.divide(numerator, denominator, out=result, where=(denominator != 0), casting='unsafe')
         
         return result
     
+    @staticmethod
+    def histogram_percentile(image: np.ndarray, percentile: float, bins: int = 65536) -> float:
+        """
+        基于直方图计算百分位数
+        
+        直方图统计只需一次顺序扫描，避免 np.percentile 的整幅复制和部分排序。
+        uint8 图像使用256级直方图，结果与 np.percentile（线性插值）一致；
+        浮点图像在 [最小值, 最大值] 区间内等宽分箱，相邻两个有序值按其在分箱内的
+        名次线性插值估计后再同样做线性插值，误差不超过一个分箱宽度
+        
+        Args:
+            image: 单通道图像（uint8 或 float32）
+            percentile: 百分位 (0-100)
+            bins: 浮点图像的直方图分箱数
+        
+        Returns:
+            float: 百分位数
+        """
+        if image.dtype == np.uint8:
+            hist = cv2.calcHist([image], [0], None, [256], [0, 256]).ravel()
+            cdf = np.cumsum(hist.astype(np.int64))
+        
+            # 线性插值：第 position 个（从0开始）有序值
+            position = (cdf[-1] - 1) * percentile / 100.0
+            lower = int(position)
+            lower_value = np.searchsorted(cdf, lower + 1)
+            upper_value = np.searchsorted(cdf, min(lower + 2, cdf[-1]))
+            return float(lower_value + (position - lower) * (upper_value - lower_value))
+        
+        min_value, max_value = cv2.minMaxLoc(image)[:2]
+        if max_value <= min_value:
+            return float(min_value)
+        
+        # 上界略微放大，保证最大值落入最后一个分箱
+        bin_width = (max_value - min_value) / (bins - 1)
+        hist = cv2.calcHist([image], [0], None, [bins], [min_value, max_value + bin_width]).ravel()
+        cdf = np.cumsum(hist.astype(np.int64))
+        
+        def ordered_value(rank: int) -> float:
+            # 第 rank 个（从0开始）有序值：假设分箱内的值均匀分布，按名次在分箱内插值
+            index = int(np.searchsorted(cdf, rank + 1))
+            below = cdf[index - 1] if index > 0 else 0
+            return min_value + (index + (rank - below + 0.5) / hist[index]) * bin_width
+        
+        position = (cdf[-1] - 1) * percentile / 100.0
+        lower = int(position)
+        lower_value = ordered_value(lower)
+        upper_value = ordered_value(min(lower + 1, cdf[-1] - 1))
+        return float(lower_value + (position - lower) * (upper_value - lower_value))
+    
     @staticmethod
     def visualize_contours(image: np.ndarray, contours: List[np.ndarray], 
                           title: str = "Contours", save_path: Optional[str] = None) -> np.ndarray:
@@ -341,24 +545,17 @@ class ImageUtils:
             return 0.0
         
         # 计算所有直线的角度
-        angles = []
-        for line in lines:
-            rho, theta = line[0]
-            angle = theta * 180 / np.pi
-            
-            # 转换到 -90 到 90 度范围
-            if angle > 90:
-                angle -= 180
-            elif angle < -90:
-                angle += 180
-            
-            # 只考虑接近水平或垂直的线
-            if abs(angle) < 45:
-                angles.append(angle)
-            elif abs(angle - 90) < 45 or abs(angle + 90) < 45:
-                angles.append(angle - 90 if angle > 0 else angle + 90)
+        angles = lines.reshape(-1, 2)[:, 1] * 180 / np.pi
+        
+        # 转换到 -90 到 90 度范围
+        angles[angles > 90] -= 180
+        
+        # 接近垂直的线折算为相对垂直方向的偏角，只保留接近水平或垂直的线
+        near_vertical = np.abs(angles) > 45
+        angles[near_vertical] -= np.copysign(90, angles[near_vertical])
+        angles = angles[np.abs(angles) < 45]
         
-        if not angles:
+        if angles.size == 0:
             return 0.0
         
         # 返回角度的中位数